@@ -8,17 +8,23 @@
 # -----------------------------------------------------------
 import sys
 import time
-from heapq import heappush, heappop
-from typing import List, Tuple, Set
-
-import numpy as np
+from typing import Dict, List, Union
 
 import constant
+from batch import get_jobs_argument, get_search_options, run_puzzles
 from constant import NO_SOLUTION, ZERO_HEURISTIC, COUNT_HEURISTIC, DIV_BY_5_HEURISTIC, \
-    NO_DOUBLE_PRESS_HEURISTIC, Node, A_STAR_ALGORITHM, TIME_TO_SOLVE_PUZZLE_SECONDS
+    NO_DOUBLE_PRESS_HEURISTIC, NO_MOVE, Node, A_STAR_ALGORITHM, TIME_TO_SOLVE_PUZZLE_SECONDS, \
+    TEXT_TRACE_FORMAT, HEAP_QUEUE, BUCKET_QUEUE, SOLUTION_CACHE_ENTRIES, SearchTimeout
 from heuristic import get_heuristic
-from utils import get_puzzle_info, grid_to_string, write_results, get_search_move, evaluate_a_star_children, \
-    get_white_token_score, prepare_performance_file, gather_performance
+from bloom_filter import BloomFilter
+from linear_algebra import is_solvable
+from open_list import OpenList, BucketOpenList
+from puzzle_loader import read_puzzles
+from search_metrics import SearchMetrics, HEAP_PHASE, SERIALIZATION_PHASE
+from search_trace import SearchTrace
+from solution_cache import get_cache_key, get_cached_performance, store_performance
+from utils import get_solution_path, board_to_grid_string, count_black_tokens, write_results, \
+    evaluate_a_star_children, get_white_token_score, get_state_key, get_closed_set_memory, prepare_performance_file
 
 
 def main(file_path):
@@ -33,93 +39,159 @@ def main(file_path):
         sys.exit()
 
     heuristic = sys.argv[1]
+    jobs = get_jobs_argument(sys.argv)
+    options = get_search_options(sys.argv)
     prepare_performance_file(A_STAR_ALGORITHM, heuristic)
-    with open(file_path) as puzzle_file:
-        for puzzle_number, puzzle in enumerate(puzzle_file):
-            max_d, max_l, grid, goal = get_puzzle_info(puzzle)
-            execute_a_star(grid, goal, max_l, puzzle_number, heuristic)
+    puzzles = []
+    for puzzle_number, n, max_d, max_l, board, goal in read_puzzles(file_path):
+        puzzles.append({'board': board, 'n': n, 'goal': goal, 'max_l': max_l,
+                        'puzzle_number': puzzle_number, 'heuristic_algorithm': heuristic})
+    run_puzzles(execute_a_star, puzzles, A_STAR_ALGORITHM, heuristic, jobs, options)
 
 
-def execute_a_star(grid: np.ndarray,
-                   goal: str,
+def execute_a_star(board: int,
+                   n: int,
+                   goal: int,
                    max_l: int,
                    puzzle_number: int,
-                   heuristic_algorithm: str):
+                   heuristic_algorithm: str,
+                   time_limit: float = TIME_TO_SOLVE_PUZZLE_SECONDS,
+                   trace_every: int = 1,
+                   trace_format: str = TEXT_TRACE_FORMAT,
+                   symmetry: bool = False,
+                   ordered: bool = False,
+                   closed_bytes: int = 0,
+                   reopen: bool = False,
+                   queue: str = HEAP_QUEUE,
+                   metrics_every: int = 0,
+                   cache: str = '',
+                   cache_entries: int = SOLUTION_CACHE_ENTRIES,
+                   cache_search: bool = False) -> tuple:
     """
     Wrapper function to run A*
-    :param grid: numpy 2D array representation of the input board.
-    :param goal: goal grid string
+    :param board: bitboard representation of the input board.
+    :param n: grid size
+    :param goal: goal bitboard
     :param max_l: maximum search path length
     :param puzzle_number: line number of the puzzle
     :param heuristic_algorithm: Heuristic algorithm to be used for this run
-    :return: void
+    :param time_limit: seconds allowed for the search
+    :param trace_every: write one every trace_every searched nodes to the search file, 0 disables it
+    :param trace_format: write the text search file, the binary one or both
+    :param symmetry: if True, rotations and reflections of a visited board are not searched again
+    :param ordered: if True, presses are only made in increasing cell order
+    :param closed_bytes: if not 0, the visited boards are kept in a Bloom filter of this many bytes
+    :param reopen: if True, a visited board reached again with a lower g(n) is searched again
+    :param queue: open list backend, a binary heap or one bucket per f(n)
+    :param metrics_every: sample one every metrics_every expansions to the metrics file, 0 disables it
+    :param cache: if not empty, SQLite file of the solution cache looked up before searching
+    :param cache_entries: number of results kept in the solution cache
+    :param cache_search: if True, search again on a cache hit, writing the search file and refreshing the result
+    :return: performance data of the run, see gather_performance
     """
     print("Executing A* Algorithm with heuristic {} and max search length of {} on the grid\n{}".format(
-        heuristic_algorithm, max_l, grid))
+        heuristic_algorithm, max_l, board_to_grid_string(board, n)))
+    cache_key = get_cache_key(n, board, A_STAR_ALGORITHM, heuristic_algorithm, max_l,
+                              {'symmetry': symmetry, 'ordered': ordered, 'closed_bytes': closed_bytes,
+                               'reopen': reopen})
+    if cache and not cache_search:
+        performance = get_cached_performance(cache, cache_entries, cache_key, puzzle_number, A_STAR_ALGORITHM,
+                                             heuristic_algorithm)
+        if performance is not None:
+            return performance
     # Initialize necessary data structures
-    open_list: List[Tuple[float, int, Node]] = []
-    open_set = set()
-    closed_set = set()
-    search_path: List[str] = []
+    open_list = BucketOpenList() if queue == BUCKET_QUEUE else OpenList()
+    closed_dict = BloomFilter(closed_bytes) if closed_bytes > 0 else {}
+    search_path = SearchTrace(puzzle_number, A_STAR_ALGORITHM, heuristic_algorithm, n, trace_every, trace_format)
+    metrics = SearchMetrics(puzzle_number, A_STAR_ALGORITHM, heuristic_algorithm, metrics_every)
 
     # initialize root node information
-    s_grid = grid_to_string(grid)
-    path = ['{}   {}'.format(0, s_grid)]
-    num_black_tokens = s_grid.count('1')
-    hn = get_heuristic(heuristic_algorithm, num_black_tokens, 0, set(), '')
-    root_node = Node(grid, s_grid, 1, path, hn, num_black_tokens, set())
+    num_black_tokens = count_black_tokens(board)
+    hn = get_heuristic(heuristic_algorithm, num_black_tokens, 0, 0, 0)
+    root_node = Node(board, 1, None, NO_MOVE, hn, num_black_tokens)
 
-    heappush(open_list, (root_node.get_fn(), get_white_token_score(s_grid), root_node))
-    open_set.add(s_grid)
+    open_list.push(get_state_key(board, NO_MOVE, n, symmetry, ordered), root_node, root_node.get_fn(),
+                   get_white_token_score(board))
 
+    solvable = is_solvable(board, n)
     start_time = time.time()
-    solution_path = a_star(open_list, open_set, closed_set, search_path, goal, max_l, heuristic_algorithm,
-                           start_time + TIME_TO_SOLVE_PUZZLE_SECONDS)
+    try:
+        if solvable:
+            solution_path = a_star(open_list, closed_dict, search_path, metrics, goal, max_l, heuristic_algorithm,
+                                   n, start_time + time_limit, symmetry, ordered, reopen)
+        else:
+            solution_path = NO_SOLUTION
+    except SearchTimeout:
+        solution_path = NO_SOLUTION
+    finally:
+        search_path.close()
     end_time = time.time()
-    write_results(puzzle_number, A_STAR_ALGORITHM, heuristic_algorithm, solution_path, search_path)
-    gather_performance(puzzle_number, np.size(grid, 0), solution_path, len(search_path),
-                       start_time, end_time, A_STAR_ALGORITHM, heuristic_algorithm)
+    closed_set_memory = get_closed_set_memory(closed_dict)
+    metrics.close(len(open_list), len(closed_dict), closed_set_memory)
+    if isinstance(closed_dict, BloomFilter):
+        print('Closed set false positive rate: {:.6f}'.format(closed_dict.get_false_positive_rate()))
+    write_results(puzzle_number, A_STAR_ALGORITHM, heuristic_algorithm, solution_path)
     print('Found no solution' if solution_path == constant.NO_SOLUTION
           else 'Found solution in {} moves'.format(len(solution_path) - 1))
+    performance = puzzle_number, n, solution_path, len(search_path), start_time, end_time, closed_set_memory
+    # A search stopped by its bound or by the time budget is not cached, it could succeed with a larger one
+    if cache and (solution_path != NO_SOLUTION or not solvable):
+        store_performance(cache, cache_entries, cache_key, performance)
+    return performance
 
 
-def a_star(open_list: List[Tuple[float, int, Node]],
-           open_set: Set[str],
-           closed_set: Set[str],
-           search_path: List[str],
-           goal_s_grid,
+def a_star(open_list: Union[OpenList, BucketOpenList],
+           closed_dict: Dict[int, int],
+           search_path: SearchTrace,
+           metrics: SearchMetrics,
+           goal,
            max_l,
            heuristic,
-           allowed_execution_time) -> List[str]:
+           n,
+           allowed_execution_time,
+           symmetry: bool = False,
+           ordered: bool = False,
+           reopen: bool = False) -> List[str]:
     """
     Runs the A* search algorithm
-    :param open_list: Priority Queue containing all discovered nodes
-    :param open_set: Set containing all grid strings of all discovered nodes from open_list
-    :param closed_set: Set containing all visited grid strings
-    :param search_path: Search path string
-    :param goal_s_grid: Goal grid string
+    :param open_list: Priority Queue containing all discovered nodes, by f(n)
+    :param closed_dict: visited bitboards and the g(n) they were searched with
+    :param search_path: Search trace of the searched nodes
+    :param metrics: counters of the expansions
+    :param goal: Goal bitboard
     :param max_l: maximum search path length
     :param heuristic: Heuristic algorithm to be used for this run
+    :param n: grid size
     :param allowed_execution_time: maximum time to solve a puzzle
+    :param symmetry: if True, the sets are keyed by canonical board, see get_state_key
+    :param ordered: if True, presses are made in increasing cell order, see get_child_moves
+    :param reopen: if True, a visited board reached again with a lower g(n) is searched again
     :return: Solution path if available, else returns a string indicating failure to find a solution
     """
     while len(open_list) > 0:
+        sample = metrics.start_expansion()
         # Pop node from priority queue
-        node_tuple = heappop(open_list)
-        node = node_tuple[2]
+        node_key, node = open_list.pop()
         # Update data structures
-        open_set.remove(node.s_grid)
-        closed_set.add(node.s_grid)
-        search_path.append(get_search_move(A_STAR_ALGORITHM, node))
+        closed_dict[node_key] = node.depth
+        if sample is not None:
+            sample.lap(HEAP_PHASE)
+        search_path.append(node)
+        if sample is not None:
+            sample.lap(SERIALIZATION_PHASE)
 
-        if node.s_grid == goal_s_grid:
+        if node.board == goal:
             print('Search path length: {}'.format(len(search_path)))
             print('Open list size: {}'.format(len(open_list)))
-            return node.path_from_root
+            print('Open list pushes: {}'.format(open_list.pushes))
+            return get_solution_path(node, n)
         if len(search_path) >= max_l or time.time() >= allowed_execution_time:
             return NO_SOLUTION
-        evaluate_a_star_children(open_list, open_set, closed_set, node, heuristic)
+        generated, added = evaluate_a_star_children(open_list, closed_dict, node, heuristic, n, symmetry, ordered,
+                                                    reopen, sample)
+        metrics.end_expansion(generated, added, len(open_list), len(closed_dict))
     return NO_SOLUTION
 
 
-main('input.txt')
+if __name__ == '__main__':
+    main('input.txt')
@@ -0,0 +1,205 @@
+# -----------------------------------------------------------
+# anytime.py 22/01/20
+#
+# Define and run anytime weighted a* search algorithm
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import sys
+import time
+from typing import Dict, List, Tuple, Union
+
+import constant
+from batch import get_jobs_argument, get_search_options, run_puzzles
+from constant import NO_SOLUTION, ZERO_HEURISTIC, COUNT_HEURISTIC, DIV_BY_5_HEURISTIC, \
+    NO_DOUBLE_PRESS_HEURISTIC, NO_MOVE, Node, ANYTIME_ALGORITHM, TIME_TO_SOLVE_PUZZLE_SECONDS, \
+    TEXT_TRACE_FORMAT, ANYTIME_INITIAL_WEIGHT, ANYTIME_WEIGHT_STEP, IMPROVEMENTS_FILE_TEMPLATE, \
+    IMPROVEMENTS_FILE_HEADER, IMPROVEMENTS_FILE_LINE, SearchTimeout
+from heuristic import get_heuristic
+from linear_algebra import is_solvable, get_flip_basis, reduce_vector
+from open_list import OpenList
+from output_writer import get_output_writer
+from puzzle_loader import read_puzzles
+from search_trace import SearchTrace
+from utils import get_solution_path, board_to_grid_string, count_black_tokens, write_results, \
+    flip_token, evaluate_a_star_children, get_white_token_score, get_state_key, get_closed_set_memory, \
+    prepare_performance_file
+
+# Weight column of the first solution given by linear algebra
+SEED_WEIGHT = 'seed'
+
+
+def main(file_path):
+    """
+    Read file, retrieve puzzle info, and execute anytime weighted a* for each puzzle
+    :param (string) file_path: relative path the input file
+    :return: void
+    """
+    heuristics = [ZERO_HEURISTIC, COUNT_HEURISTIC, DIV_BY_5_HEURISTIC, NO_DOUBLE_PRESS_HEURISTIC]
+    if len(sys.argv) < 2 or sys.argv[1] not in heuristics:
+        print('Invalid heuristic. Accepted heuristics are: {}'.format(heuristics))
+        sys.exit()
+
+    heuristic = sys.argv[1]
+    jobs = get_jobs_argument(sys.argv)
+    options = get_search_options(sys.argv)
+    prepare_performance_file(ANYTIME_ALGORITHM, heuristic)
+    puzzles = []
+    for puzzle_number, n, max_d, max_l, board, goal in read_puzzles(file_path):
+        puzzles.append({'board': board, 'n': n, 'goal': goal, 'max_l': max_l,
+                        'puzzle_number': puzzle_number, 'heuristic_algorithm': heuristic})
+    run_puzzles(execute_anytime, puzzles, ANYTIME_ALGORITHM, heuristic, jobs, options)
+
+
+def execute_anytime(board: int,
+                    n: int,
+                    goal: int,
+                    max_l: int,
+                    puzzle_number: int,
+                    heuristic_algorithm: str,
+                    time_limit: float = TIME_TO_SOLVE_PUZZLE_SECONDS,
+                    trace_every: int = 1,
+                    trace_format: str = TEXT_TRACE_FORMAT,
+                    seed_incumbent: bool = False) -> tuple:
+    """
+    Wrapper function to run anytime weighted A*
+    :param board: bitboard representation of the input board.
+    :param n: grid size
+    :param goal: goal bitboard
+    :param max_l: maximum search path length
+    :param puzzle_number: line number of the puzzle
+    :param heuristic_algorithm: Heuristic algorithm to be used for this run
+    :param time_limit: seconds allowed for the search
+    :param trace_every: write one every trace_every searched nodes to the search file, 0 disables it
+    :param trace_format: write the text search file, the binary one or both
+    :param seed_incumbent: if True, the search starts from a first solution given by linear algebra
+    :return: performance data of the run, see gather_performance
+    """
+    print("Executing anytime weighted A* Algorithm with heuristic {} and max search length of {} on the grid\n{}"
+          .format(heuristic_algorithm, max_l, board_to_grid_string(board, n)))
+    # Initialize necessary data structures
+    open_list = OpenList()
+    closed_dict = {}
+    improvements = []
+    search_path = SearchTrace(puzzle_number, ANYTIME_ALGORITHM, heuristic_algorithm, n, trace_every, trace_format)
+
+    # initialize root node information
+    num_black_tokens = count_black_tokens(board)
+    hn = get_heuristic(heuristic_algorithm, num_black_tokens, 0, 0, 0)
+    root_node = Node(board, 1, None, NO_MOVE, hn, num_black_tokens)
+
+    open_list.push(get_state_key(board, NO_MOVE, n, False), root_node, 1 + ANYTIME_INITIAL_WEIGHT * hn,
+                   get_white_token_score(board))
+
+    start_time = time.time()
+    try:
+        if is_solvable(board, n):
+            if seed_incumbent:
+                seed_node = get_seed_node(board, n)
+                improvements.append((seed_node.depth - 1, 0, time.time() - start_time, SEED_WEIGHT, seed_node))
+            anytime(open_list, closed_dict, search_path, improvements, goal, max_l, heuristic_algorithm, n,
+                    start_time, start_time + time_limit)
+    except SearchTimeout:
+        # The best solution found before the time budget was spent is kept
+        pass
+    finally:
+        search_path.close()
+    end_time = time.time()
+    solution_path = get_solution_path(improvements[-1][-1], n) if len(improvements) > 0 else NO_SOLUTION
+    write_results(puzzle_number, ANYTIME_ALGORITHM, heuristic_algorithm, solution_path)
+    write_improvements(puzzle_number, heuristic_algorithm, improvements)
+    print('Found no solution' if solution_path == constant.NO_SOLUTION
+          else 'Found solution in {} moves after {} improvements'.format(len(solution_path) - 1, len(improvements)))
+    return puzzle_number, n, solution_path, len(search_path), start_time, end_time, get_closed_set_memory(closed_dict)
+
+
+def anytime(open_list: OpenList,
+            closed_dict: Dict[int, int],
+            search_path: SearchTrace,
+            improvements: List[Tuple[int, int, float, Union[float, str], Node]],
+            goal,
+            max_l,
+            heuristic,
+            n,
+            start_time,
+            allowed_execution_time):
+    """
+    Runs weighted A* with the priority g(n) + weight * h(n), keeping the open list across improvements.
+    Each solution found lowers the weight by ANYTIME_WEIGHT_STEP down to 1 and reorders the open list.
+    Nodes whose g(n) + h(n) does not beat the best solution are dropped, visited boards reached again with
+    a lower g(n) are searched again. The search ends once the open list is empty, max_l nodes were searched
+    or the time budget is spent
+    :param open_list: Priority Queue containing all discovered nodes, by g(n) + weight * h(n)
+    :param closed_dict: visited bitboards and the g(n) they were searched with
+    :param search_path: Search trace of the searched nodes
+    :param improvements: solutions found, appended as cost, search length, seconds, weight and goal node.
+                         The search only looks for solutions shorter than the last one
+    :param goal: Goal bitboard
+    :param max_l: maximum search path length
+    :param heuristic: Heuristic algorithm to be used for this run
+    :param n: grid size
+    :param start_time: time the search started
+    :param allowed_execution_time: maximum time to solve a puzzle
+    :return: void
+    """
+    weight = ANYTIME_INITIAL_WEIGHT
+    best_depth = improvements[-1][-1].depth if len(improvements) > 0 else float('inf')
+    while len(open_list) > 0:
+        node_key, node = open_list.pop()
+        if node.get_fn() >= best_depth:
+            continue
+        closed_dict[node_key] = node.depth
+        search_path.append(node)
+
+        if node.board == goal:
+            best_depth = node.depth
+            improvements.append((node.depth - 1, len(search_path), time.time() - start_time, weight, node))
+            print('Found solution in {} moves with weight {} after {} searched nodes'.format(
+                node.depth - 1, weight, len(search_path)))
+            if weight > 1:
+                weight = max(1.0, weight - ANYTIME_WEIGHT_STEP)
+                open_list.reprioritize(lambda open_node: open_node.get_gn() + weight * open_node.get_hn())
+            continue
+        if len(search_path) >= max_l or time.time() >= allowed_execution_time:
+            return
+        evaluate_a_star_children(open_list, closed_dict, node, heuristic, n, reopen=True, weight=weight)
+
+
+def get_seed_node(board: int, n: int) -> Node:
+    """
+    Solve a board with a particular solution of the GF(2) system, without minimizing it over the null space.
+    It is a single reduction against the basis, and optimal on grid sizes whose null space is empty
+    :param board: bitboard representation of a solvable grid
+    :param n: grid size
+    :return: goal node, its parents leading back to the board
+    """
+    basis, _ = get_flip_basis(n)
+    _, combination = reduce_vector(basis, board, 0)
+    node = Node(board, 1)
+    for index in range(n * n):
+        if combination >> index & 1:
+            node = Node(flip_token(node.board, n, *divmod(index, n)), node.depth + 1, node, index)
+    return node
+
+
+def write_improvements(puzzle_number: int,
+                       heuristic: str,
+                       improvements: List[Tuple[int, int, float, Union[float, str], Node]]):
+    """
+    Write the solutions found during a run to its improvements file, next to the performance files
+    :param puzzle_number: line number of the puzzle prepended to the name of the file
+    :param heuristic: Heuristic used to solve puzzle
+    :param improvements: cost, search length, seconds, weight and goal node of each solution found,
+                         the weight of a first solution given by linear algebra being SEED_WEIGHT
+    :return: void
+    """
+    filename = IMPROVEMENTS_FILE_TEMPLATE.format(heuristic, puzzle_number, ANYTIME_ALGORITHM)
+    lines = [IMPROVEMENTS_FILE_HEADER.format('Solution length', 'Search length', 'Time taken (seconds)', 'Weight')]
+    for cost, search_length, seconds, weight, _ in improvements:
+        lines.append(IMPROVEMENTS_FILE_LINE.format(cost, search_length, seconds, weight))
+    get_output_writer().write(filename, ''.join(lines))
+
+
+if __name__ == '__main__':
+    main('input.txt')
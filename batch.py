@@ -0,0 +1,221 @@
+# -----------------------------------------------------------
+# batch.py 22/01/20
+#
+# Define the batch runner solving the puzzles of an input file, serially or in a process pool
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import inspect
+import math
+import signal
+from multiprocessing import Pool
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from constant import NO_SOLUTION, TIME_TO_SOLVE_PUZZLE_SECONDS, TEXT_TRACE_FORMAT, BINARY_TRACE_FORMAT, \
+    BOTH_TRACE_FORMATS, TRANSPOSITION_TABLE_SIZE, HEAP_QUEUE, BUCKET_QUEUE, SOLUTION_CACHE_ENTRIES, BEAM_WIDTH, \
+    SearchTimeout
+from output_writer import close_output, flush_output
+from utils import gather_performance, write_results
+
+JOBS_ARGUMENT = '--jobs'
+TRACE_EVERY_ARGUMENT = '--trace-every'
+TRACE_FORMAT_ARGUMENT = '--trace-format'
+TT_SIZE_ARGUMENT = '--tt-size'
+CLOSED_BYTES_ARGUMENT = '--closed-bytes'
+QUEUE_ARGUMENT = '--queue'
+METRICS_EVERY_ARGUMENT = '--metrics-every'
+CACHE_ARGUMENT = '--cache'
+CACHE_ENTRIES_ARGUMENT = '--cache-entries'
+WORKERS_ARGUMENT = '--workers'
+BEAM_WIDTH_ARGUMENT = '--beam-width'
+BEAM_RESTARTS_ARGUMENT = '--beam-restarts'
+CACHE_SEARCH_ARGUMENT = '--cache-search'
+SEED_INCUMBENT_ARGUMENT = '--seed-incumbent'
+SYMMETRY_ARGUMENT = '--symmetry'
+ORDERED_ARGUMENT = '--ordered'
+REOPEN_ARGUMENT = '--reopen'
+VALUE_ARGUMENTS = [JOBS_ARGUMENT, TRACE_EVERY_ARGUMENT, TRACE_FORMAT_ARGUMENT, TT_SIZE_ARGUMENT, CLOSED_BYTES_ARGUMENT,
+                   QUEUE_ARGUMENT, METRICS_EVERY_ARGUMENT, CACHE_ARGUMENT, CACHE_ENTRIES_ARGUMENT, WORKERS_ARGUMENT,
+                   BEAM_WIDTH_ARGUMENT, BEAM_RESTARTS_ARGUMENT]
+FLAG_ARGUMENTS = [SYMMETRY_ARGUMENT, ORDERED_ARGUMENT, REOPEN_ARGUMENT, CACHE_SEARCH_ARGUMENT,
+                  SEED_INCUMBENT_ARGUMENT]
+
+
+def get_int_argument(argv: List[str], name: str, default: int, minimum: int) -> int:
+    """
+    Read the integer value following an option on the command line
+    Example: (['bfs.py', 'count-h', '--jobs', '4'], '--jobs', 1, 1) => 4
+    :param argv: command line arguments
+    :param name: name of the option
+    :param default: value if the option is not specified
+    :param minimum: smallest accepted value
+    :return: value of the option
+    """
+    if name not in argv:
+        return default
+    index = argv.index(name)
+    if index + 1 >= len(argv) or not argv[index + 1].isdigit() or int(argv[index + 1]) < minimum:
+        raise SystemExit('{} expects an integer greater or equal to {}'.format(name, minimum))
+    return int(argv[index + 1])
+
+
+def get_string_argument(argv: List[str], name: str, default: str) -> str:
+    """
+    Read the value following an option on the command line
+    Example: (['dfs.py', '--cache', 'cache.sqlite'], '--cache', '') => 'cache.sqlite'
+    :param argv: command line arguments
+    :param name: name of the option
+    :param default: value if the option is not specified
+    :return: value of the option
+    """
+    if name not in argv:
+        return default
+    index = argv.index(name)
+    if index + 1 >= len(argv):
+        raise SystemExit('{} expects a value'.format(name))
+    return argv[index + 1]
+
+
+def get_choice_argument(argv: List[str], name: str, choices: List[str]) -> str:
+    """
+    Read the value following an option on the command line among accepted values
+    Example: (['dfs.py', '--trace-format', 'binary'], '--trace-format', ['text', 'binary']) => 'binary'
+    :param argv: command line arguments
+    :param name: name of the option
+    :param choices: accepted values, the first one is the default
+    :return: value of the option
+    """
+    if name not in argv:
+        return choices[0]
+    index = argv.index(name)
+    if index + 1 >= len(argv) or argv[index + 1] not in choices:
+        raise SystemExit('{} expects one of {}'.format(name, choices))
+    return argv[index + 1]
+
+
+def get_jobs_argument(argv: List[str]) -> int:
+    """
+    Read the number of worker processes from the command line
+    :param argv: command line arguments
+    :return: number of worker processes, 1 if not specified
+    """
+    return get_int_argument(argv, JOBS_ARGUMENT, 1, 1)
+
+
+def get_search_options(argv: List[str]) -> Dict:
+    """
+    Read the options forwarded to the execute wrappers from the command line.
+    Each wrapper only receives the options it accepts
+    Example: ['dfs.py', '--trace-every', '10'] => {'trace_every': 10, 'trace_format': 'text', ...}
+    :param argv: command line arguments
+    :return: keyword arguments of the execute wrappers
+    """
+    if SYMMETRY_ARGUMENT in argv and ORDERED_ARGUMENT in argv:
+        # The order of the presses is not preserved by a rotation or a reflection
+        raise SystemExit('{} cannot be combined with {}'.format(SYMMETRY_ARGUMENT, ORDERED_ARGUMENT))
+    return {'trace_every': get_int_argument(argv, TRACE_EVERY_ARGUMENT, 1, 0),
+            'trace_format': get_choice_argument(argv, TRACE_FORMAT_ARGUMENT,
+                                                [TEXT_TRACE_FORMAT, BINARY_TRACE_FORMAT, BOTH_TRACE_FORMATS]),
+            'tt_size': get_int_argument(argv, TT_SIZE_ARGUMENT, TRANSPOSITION_TABLE_SIZE, 0),
+            'closed_bytes': get_int_argument(argv, CLOSED_BYTES_ARGUMENT, 0, 0),
+            'queue': get_choice_argument(argv, QUEUE_ARGUMENT, [HEAP_QUEUE, BUCKET_QUEUE]),
+            'metrics_every': get_int_argument(argv, METRICS_EVERY_ARGUMENT, 0, 0),
+            'cache': get_string_argument(argv, CACHE_ARGUMENT, ''),
+            'cache_entries': get_int_argument(argv, CACHE_ENTRIES_ARGUMENT, SOLUTION_CACHE_ENTRIES, 1),
+            'cache_search': CACHE_SEARCH_ARGUMENT in argv,
+            'seed_incumbent': SEED_INCUMBENT_ARGUMENT in argv,
+            'workers': get_int_argument(argv, WORKERS_ARGUMENT, 0, 0),
+            'beam_width': get_int_argument(argv, BEAM_WIDTH_ARGUMENT, BEAM_WIDTH, 1),
+            'beam_restarts': get_int_argument(argv, BEAM_RESTARTS_ARGUMENT, 0, 0),
+            'symmetry': SYMMETRY_ARGUMENT in argv,
+            'ordered': ORDERED_ARGUMENT in argv,
+            'reopen': REOPEN_ARGUMENT in argv}
+
+
+def get_accepted_options(execute: Callable[..., Tuple], options: Dict) -> Dict:
+    """
+    Keep the options that are parameters of an execute wrapper
+    :param execute: execute_* wrapper of the search
+    :param options: keyword arguments read from the command line
+    :return: keyword arguments accepted by the wrapper
+    """
+    parameters = inspect.signature(execute).parameters
+    return {name: value for name, value in options.items() if name in parameters}
+
+
+def run_puzzles(execute: Callable[..., Tuple],
+                puzzles: Iterable[Dict],
+                algorithm: str,
+                heuristic: str,
+                jobs: int = 1,
+                options: Dict = None):
+    """
+    Execute a search on every puzzle and append one performance line per puzzle, ordered by puzzle number
+    :param execute: execute_* wrapper of the search, returns the performance data of the puzzle
+    :param puzzles: keyword arguments of execute for each puzzle, in puzzle number order
+    :param algorithm: Algorithm used for the current run
+    :param heuristic: Heuristic used to solve puzzle
+    :param jobs: number of worker processes
+    :param options: keyword arguments added to the arguments of every puzzle, if execute accepts them
+    :return: void
+    """
+    run_tasks(((execute, puzzle, algorithm, heuristic) for puzzle in puzzles), jobs, options)
+
+
+def run_tasks(tasks: Iterable[Tuple[Callable[..., Tuple], Dict, str, str]], jobs: int = 1, options: Dict = None):
+    """
+    Execute every task and append its performance line to the performance file of its algorithm and heuristic.
+    With more than one job, tasks are solved in a process pool and each worker interrupts
+    its own search once the time budget is spent
+    :param tasks: execute wrapper, its keyword arguments, algorithm and heuristic.
+                  Puzzles of a same algorithm and heuristic must be in puzzle number order
+    :param jobs: number of worker processes
+    :param options: keyword arguments added to the arguments of every task accepting them
+    :return: void
+    """
+    if options:
+        tasks = ((execute, dict(puzzle, **get_accepted_options(execute, options)), algorithm, heuristic)
+                 for execute, puzzle, algorithm, heuristic in tasks)
+    if jobs <= 1:
+        for execute, puzzle, algorithm, heuristic in tasks:
+            gather_performance(*execute(**puzzle), algorithm, heuristic)
+        return
+
+    tasks = list(tasks)
+    # Threads do not survive a fork, the writer is stopped and started again after the pool is created
+    close_output()
+    with Pool(jobs) as pool:
+        # imap yields in submission order, so performance lines stay ordered by puzzle number
+        for task, performance in zip(tasks, pool.imap(solve_puzzle, tasks)):
+            gather_performance(*performance, task[2], task[3])
+
+
+def solve_puzzle(task: Tuple[Callable[..., Tuple], Dict, str, str]) -> Tuple:
+    """
+    Worker entry point. Arms a timer that cancels the search when the time budget is spent,
+    instead of relying on the deadline checked by the search loop
+    :param task: execute wrapper, its keyword arguments, algorithm and heuristic
+    :return: performance data of the puzzle
+    """
+    execute, puzzle, algorithm, heuristic = task
+    signal.signal(signal.SIGALRM, raise_search_timeout)
+    signal.setitimer(signal.ITIMER_REAL, TIME_TO_SOLVE_PUZZLE_SECONDS)
+    try:
+        return execute(**puzzle, time_limit=math.inf)
+    except SearchTimeout:
+        # Cancelled outside of the search loop, the solution was not written
+        write_results(puzzle['puzzle_number'], algorithm, heuristic, NO_SOLUTION)
+        return puzzle['puzzle_number'], puzzle['n'], NO_SOLUTION, 0, 0, TIME_TO_SOLVE_PUZZLE_SECONDS, 0
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        # Workers exit without running atexit handlers, the output of the puzzle is written before returning
+        flush_output()
+
+
+def raise_search_timeout(signum, frame):
+    """
+    SIGALRM handler interrupting the running search
+    :return: void
+    """
+    raise SearchTimeout()
@@ -0,0 +1,171 @@
+# -----------------------------------------------------------
+# beam.py 22/01/20
+#
+# Define and run beam search algorithm, keeping the best nodes of each depth
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import heapq
+import sys
+import time
+from typing import Dict, List, Tuple, Union
+
+import constant
+from batch import get_jobs_argument, get_search_options, run_puzzles
+from constant import NO_SOLUTION, ZERO_HEURISTIC, COUNT_HEURISTIC, DIV_BY_5_HEURISTIC, \
+    NO_DOUBLE_PRESS_HEURISTIC, NO_MOVE, DOUBLE_PRESS, Node, BEAM_ALGORITHM, TIME_TO_SOLVE_PUZZLE_SECONDS, \
+    TEXT_TRACE_FORMAT, BEAM_WIDTH, BEAM_WIDTH_FACTOR, SearchTimeout
+from heuristic import get_heuristic
+from linear_algebra import is_solvable
+from puzzle_loader import read_puzzles
+from search_trace import SearchTrace
+from utils import get_solution_path, board_to_grid_string, count_black_tokens, write_results, expand_children, \
+    get_closed_set_memory, prepare_performance_file
+
+# h(n), board, parent node, pressed cell index, black tokens and pressed cells bitmask of a child
+Candidate = Tuple[float, int, Node, int, int, int]
+
+
+def main(file_path):
+    """
+    Read file, retrieve puzzle info, and execute beam search for each puzzle
+    :param (string) file_path: relative path the input file
+    :return: void
+    """
+    heuristics = [ZERO_HEURISTIC, COUNT_HEURISTIC, DIV_BY_5_HEURISTIC, NO_DOUBLE_PRESS_HEURISTIC]
+    if len(sys.argv) < 2 or sys.argv[1] not in heuristics:
+        print('Invalid heuristic. Accepted heuristics are: {}'.format(heuristics))
+        sys.exit()
+
+    heuristic = sys.argv[1]
+    jobs = get_jobs_argument(sys.argv)
+    options = get_search_options(sys.argv)
+    prepare_performance_file(BEAM_ALGORITHM, heuristic)
+    puzzles = []
+    for puzzle_number, n, max_d, max_l, board, goal in read_puzzles(file_path):
+        puzzles.append({'board': board, 'n': n, 'goal': goal, 'max_l': max_l,
+                        'puzzle_number': puzzle_number, 'heuristic_algorithm': heuristic})
+    run_puzzles(execute_beam, puzzles, BEAM_ALGORITHM, heuristic, jobs, options)
+
+
+def execute_beam(board: int,
+                 n: int,
+                 goal: int,
+                 max_l: int,
+                 puzzle_number: int,
+                 heuristic_algorithm: str,
+                 time_limit: float = TIME_TO_SOLVE_PUZZLE_SECONDS,
+                 trace_every: int = 1,
+                 trace_format: str = TEXT_TRACE_FORMAT,
+                 beam_width: int = BEAM_WIDTH,
+                 beam_restarts: int = 0) -> tuple:
+    """
+    Wrapper function to run beam search
+    :param board: bitboard representation of the input board.
+    :param n: grid size
+    :param goal: goal bitboard
+    :param max_l: maximum search path length, over all the restarts
+    :param puzzle_number: line number of the puzzle
+    :param heuristic_algorithm: Heuristic algorithm to be used for this run
+    :param time_limit: seconds allowed for the search
+    :param trace_every: write one every trace_every searched nodes to the search file, 0 disables it
+    :param trace_format: write the text search file, the binary one or both
+    :param beam_width: number of nodes kept at each depth
+    :param beam_restarts: number of searches started again with a BEAM_WIDTH_FACTOR times wider beam,
+                          once a beam runs out of nodes, e.g. with no-dbl-press-h
+    :return: performance data of the run, see gather_performance
+    """
+    print("Executing beam search with heuristic {}, beam width {} and max search length of {} on the grid\n{}".format(
+        heuristic_algorithm, beam_width, max_l, board_to_grid_string(board, n)))
+    search_path = SearchTrace(puzzle_number, BEAM_ALGORITHM, heuristic_algorithm, n, trace_every, trace_format)
+    layer_memory = 0
+    goal_node = None
+
+    # initialize root node information
+    num_black_tokens = count_black_tokens(board)
+    hn = get_heuristic(heuristic_algorithm, num_black_tokens, 0, 0, 0)
+    root_node = Node(board, 1, None, NO_MOVE, hn, num_black_tokens)
+
+    start_time = time.time()
+    try:
+        if is_solvable(board, n):
+            for restart in range(beam_restarts + 1):
+                goal_node, memory = beam(root_node, search_path, goal, max_l, heuristic_algorithm, n,
+                                         start_time + time_limit, beam_width * BEAM_WIDTH_FACTOR ** restart)
+                layer_memory = max(layer_memory, memory)
+                if goal_node is not None or len(search_path) >= max_l or time.time() >= start_time + time_limit:
+                    break
+                print('Beam of width {} ran out of nodes'.format(beam_width * BEAM_WIDTH_FACTOR ** restart))
+    except SearchTimeout:
+        # Cancelled by the time budget before reaching the goal
+        pass
+    finally:
+        search_path.close()
+    end_time = time.time()
+    solution_path = NO_SOLUTION if goal_node is None else get_solution_path(goal_node, n)
+    write_results(puzzle_number, BEAM_ALGORITHM, heuristic_algorithm, solution_path)
+    print('Found no solution' if solution_path == constant.NO_SOLUTION
+          else 'Found solution in {} moves'.format(len(solution_path) - 1))
+    return puzzle_number, n, solution_path, len(search_path), start_time, end_time, layer_memory
+
+
+def beam(root_node: Node,
+         search_path: SearchTrace,
+         goal,
+         max_l,
+         heuristic,
+         n,
+         allowed_execution_time,
+         beam_width: int) -> Tuple[Union[Node, None], int]:
+    """
+    Runs the beam search algorithm. The nodes of a depth are searched by h(n), then the beam_width children
+    with the lowest h(n) make the next depth. A child undoing the press of its parent is not generated.
+    Memory is bounded by the children of a single depth and the paths of the beam,
+    the boards of previous depths are not kept and may be searched again
+    :param root_node: Node of the input board
+    :param search_path: Search trace of the searched nodes
+    :param goal: Goal bitboard
+    :param max_l: maximum search path length
+    :param heuristic: Heuristic algorithm to be used for this run
+    :param n: grid size
+    :param allowed_execution_time: maximum time to solve a puzzle
+    :param beam_width: number of nodes kept at each depth
+    :return: goal node, None if not found, and bytes held by the largest set of children of a depth
+    """
+    layer = [root_node]
+    layer_memory = 0
+    while len(layer) > 0:
+        candidates: Dict[int, Candidate] = {}
+        for node in layer:
+            search_path.append(node)
+            if node.board == goal:
+                print('Search path length: {}'.format(len(search_path)))
+                return node, layer_memory
+            if len(search_path) >= max_l or time.time() >= allowed_execution_time:
+                return None, layer_memory
+            for index, child_board, child_black_tokens, child_press, child_hn in \
+                    zip(*expand_children(node, n, heuristic)):
+                if child_hn == DOUBLE_PRESS or index == node.move or child_board in candidates:
+                    continue
+                candidates[child_board] = (child_hn, child_board, node, index, child_black_tokens,
+                                           node.pressed_cells | child_press)
+        layer_memory = max(layer_memory, get_closed_set_memory(candidates))
+        layer = get_next_layer(candidates, beam_width)
+    return None, layer_memory
+
+
+def get_next_layer(candidates: Dict[int, Candidate], beam_width: int) -> List[Node]:
+    """
+    Keep the children with the lowest h(n), ties broken by board as in the open list of BFS
+    :param candidates: children of a depth by board
+    :param beam_width: number of nodes kept
+    :return: nodes of the next depth, in search order
+    """
+    return [Node(board, parent.depth + 1, parent, index, hn, black_tokens, pressed_cells)
+            for hn, board, parent, index, black_tokens, pressed_cells
+            in heapq.nsmallest(beam_width, candidates.values(), key=lambda candidate: candidate[:2])]
+
+
+if __name__ == '__main__':
+    main('input.txt')
@@ -0,0 +1,190 @@
+# -----------------------------------------------------------
+# benchmark.py 22/01/20
+#
+# Define and run the benchmark of algorithm and heuristic combinations over a puzzle corpus,
+# compared against a saved baseline
+#
+# Usage: python3 benchmark.py [COMBINATION ...] [--corpus FILE] [--baseline FILE] [--save-baseline] [--repeat N]
+#                             [--time-threshold P] [--expansion-threshold P] [--memory-threshold P]
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import hashlib
+import json
+import sys
+import tracemalloc
+from typing import Dict, List, Tuple
+
+from batch import TRACE_EVERY_ARGUMENT, get_int_argument, get_string_argument, get_search_options, \
+    get_accepted_options
+from constant import NO_SOLUTION
+from experiment import EXECUTE_FUNCTIONS, get_combinations, get_execute_arguments
+from linear_algebra import get_flip_basis
+from puzzle_loader import read_puzzles
+from solution_table import get_solution_table
+from utils import get_flip_masks
+
+CORPUS_ARGUMENT = '--corpus'
+BASELINE_ARGUMENT = '--baseline'
+REPEAT_ARGUMENT = '--repeat'
+TIME_THRESHOLD_ARGUMENT = '--time-threshold'
+EXPANSION_THRESHOLD_ARGUMENT = '--expansion-threshold'
+MEMORY_THRESHOLD_ARGUMENT = '--memory-threshold'
+SAVE_BASELINE_ARGUMENT = '--save-baseline'
+BENCHMARK_VALUE_ARGUMENTS = [CORPUS_ARGUMENT, BASELINE_ARGUMENT, REPEAT_ARGUMENT, TIME_THRESHOLD_ARGUMENT,
+                             EXPANSION_THRESHOLD_ARGUMENT, MEMORY_THRESHOLD_ARGUMENT]
+DEFAULT_CORPUS = 'input.txt'
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+# Allowed increase over the baseline, in percent. Expansions and memory are deterministic, the wall time is not
+DEFAULT_THRESHOLDS = {'seconds': 25, 'expansions': 0, 'closed_set_memory': 10, 'peak_memory': 10}
+
+
+def get_combination_arguments(args: List[str]) -> List[str]:
+    """
+    Remove the benchmark options and their values, leaving the arguments read by get_combinations
+    :param args: command line arguments, without the script name
+    :return: remaining arguments
+    """
+    return [arg for index, arg in enumerate(args)
+            if arg not in BENCHMARK_VALUE_ARGUMENTS + [SAVE_BASELINE_ARGUMENT]
+            and not (index > 0 and args[index - 1] in BENCHMARK_VALUE_ARGUMENTS)]
+
+
+def read_corpus(file_path: str) -> Tuple[List[Tuple[int, int, int, int, int, int]], str]:
+    """
+    Read the puzzles of a corpus and fingerprint it, a baseline only applies to the corpus it was measured on
+    :param file_path: relative path to the corpus file, or '-' for stdin
+    :return: puzzle number, n, max_d, max_l, board and goal of each puzzle, and the digest of the file
+    """
+    puzzles = []
+    digest = hashlib.sha256()
+    for puzzle_number, n, max_d, max_l, board, goal in read_puzzles(file_path):
+        # Warm the per grid size caches so they are not timed with the first puzzle
+        get_flip_masks(n)
+        get_flip_basis(n)
+        get_solution_table(n)
+        puzzles.append((puzzle_number, n, max_d, max_l, board, goal))
+        digest.update('{} {} {} {:x}\n'.format(n, max_d, max_l, board).encode())
+    return puzzles, digest.hexdigest()
+
+
+def get_traced_peak_memory(execute, arguments: Dict) -> int:
+    """
+    Run a puzzle once more with the Python allocations traced. Tracing slows the search down, so this run is not
+    timed, and the peak is its own as the trace starts from zero. Memory of worker processes is not traced
+    :param execute: execute wrapper of the combination
+    :param arguments: keyword arguments of the execute wrapper
+    :return: peak bytes allocated during the run
+    """
+    tracemalloc.start()
+    try:
+        execute(**arguments)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_combination(algorithm: str, heuristic: str, puzzles: List[Tuple[int, int, int, int, int, int]],
+                          options: Dict, repeat: int) -> Dict:
+    """
+    Run a combination over every puzzle of the corpus in this process
+    :param algorithm: Algorithm to run
+    :param heuristic: Heuristic used to solve puzzles
+    :param puzzles: puzzles of the corpus, see read_corpus
+    :param options: keyword arguments added to the arguments of the execute wrapper if it accepts them
+    :param repeat: number of runs of each puzzle, the fastest one is kept
+    :return: puzzles solved, searched nodes, seconds, largest closed set memory and largest peak memory of a puzzle
+    """
+    execute = EXECUTE_FUNCTIONS[algorithm]
+    result = {'puzzles': len(puzzles), 'solved': 0, 'expansions': 0, 'seconds': 0.0, 'closed_set_memory': 0,
+              'peak_memory': 0}
+    for puzzle in puzzles:
+        arguments = dict(get_execute_arguments(algorithm, heuristic, *puzzle), **get_accepted_options(execute, options))
+        seconds = []
+        for _ in range(repeat):
+            _, _, solution_path, search_path_len, start_time, end_time, closed_set_memory = execute(**arguments)
+            seconds.append(end_time - start_time)
+        result['solved'] += solution_path != NO_SOLUTION
+        result['expansions'] += search_path_len
+        result['seconds'] += min(seconds)
+        result['closed_set_memory'] = max(result['closed_set_memory'], closed_set_memory)
+        result['peak_memory'] = max(result['peak_memory'], get_traced_peak_memory(execute, arguments))
+    return result
+
+
+def compare_results(results: Dict[str, Dict], baseline: Dict[str, Dict], thresholds: Dict[str, int]) -> List[str]:
+    """
+    Compare the results of each combination with its baseline
+    :param results: results by combination, see benchmark_combination
+    :param baseline: saved results by combination
+    :param thresholds: allowed increase of each compared measure, in percent
+    :return: description of each regression
+    """
+    regressions = []
+    for combination, result in results.items():
+        base = baseline.get(combination)
+        if base is None:
+            print('{}: no baseline'.format(combination))
+            continue
+        if result['solved'] < base['solved']:
+            regressions.append('{}: solved {} puzzles, baseline {}'.format(combination, result['solved'],
+                                                                           base['solved']))
+        for measure, threshold in thresholds.items():
+            change = (result[measure] - base[measure]) / base[measure] * 100 if base[measure] > 0 else 0.0
+            print('{}: {} {:.6g} (baseline {:.6g}, {:+.1f}%)'.format(combination, measure, result[measure],
+                                                                    base[measure], change))
+            if change > threshold:
+                regressions.append('{}: {} increased by {:.1f}%, threshold {}%'.format(combination, measure, change,
+                                                                                        threshold))
+    return regressions
+
+
+def main(argv: List[str]):
+    """
+    Benchmark the combinations over the corpus, then save the results as baseline or compare them with it
+    :param argv: command line arguments
+    :return: void
+    """
+    combinations = get_combinations(get_combination_arguments(argv[1:]))
+    options = get_search_options(argv)
+    if TRACE_EVERY_ARGUMENT not in argv:
+        # Writing the search files would be measured with the search
+        options['trace_every'] = 0
+    repeat = get_int_argument(argv, REPEAT_ARGUMENT, 1, 1)
+    thresholds = {'seconds': get_int_argument(argv, TIME_THRESHOLD_ARGUMENT, DEFAULT_THRESHOLDS['seconds'], 0),
+                  'expansions': get_int_argument(argv, EXPANSION_THRESHOLD_ARGUMENT,
+                                                 DEFAULT_THRESHOLDS['expansions'], 0),
+                  'closed_set_memory': get_int_argument(argv, MEMORY_THRESHOLD_ARGUMENT,
+                                                        DEFAULT_THRESHOLDS['closed_set_memory'], 0),
+                  'peak_memory': get_int_argument(argv, MEMORY_THRESHOLD_ARGUMENT, DEFAULT_THRESHOLDS['peak_memory'],
+                                                  0)}
+    baseline_path = get_string_argument(argv, BASELINE_ARGUMENT, DEFAULT_BASELINE)
+    puzzles, digest = read_corpus(get_string_argument(argv, CORPUS_ARGUMENT, DEFAULT_CORPUS))
+
+    results = {'{}:{}'.format(algorithm, heuristic): benchmark_combination(algorithm, heuristic, puzzles, options,
+                                                                           repeat)
+               for algorithm, heuristic in combinations}
+
+    if SAVE_BASELINE_ARGUMENT in argv:
+        with open(baseline_path, 'w') as fp:
+            json.dump({'corpus_sha256': digest, 'results': results}, fp, indent=2)
+        print('Saved baseline of {} combinations to {}'.format(len(results), baseline_path))
+        return
+    try:
+        with open(baseline_path) as fp:
+            baseline = json.load(fp)
+    except FileNotFoundError:
+        print(json.dumps(results, indent=2))
+        print('No baseline at {}, save one with {}'.format(baseline_path, SAVE_BASELINE_ARGUMENT))
+        return
+    if baseline['corpus_sha256'] != digest:
+        raise SystemExit('Baseline {} was measured on another corpus'.format(baseline_path))
+    regressions = compare_results(results, baseline['results'], thresholds)
+    if len(regressions) > 0:
+        raise SystemExit('Regressions:\n{}'.format('\n'.join(regressions)))
+    print('No regression over {} combinations'.format(len(results)))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,159 @@
+# -----------------------------------------------------------
+# bidirectional.py 22/01/20
+#
+# Define and run bidirectional search algorithm
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import sys
+import time
+from typing import List
+
+import constant
+from batch import get_jobs_argument, get_search_options, run_puzzles
+from constant import NO_SOLUTION, NO_HEURISTIC, ZERO_HEURISTIC, COUNT_HEURISTIC, DIV_BY_5_HEURISTIC, \
+    NO_DOUBLE_PRESS_HEURISTIC, Node, BIDIRECTIONAL_ALGORITHM, TIME_TO_SOLVE_PUZZLE_SECONDS, TEXT_TRACE_FORMAT, \
+    SearchTimeout
+from linear_algebra import is_solvable
+from puzzle_loader import read_puzzles
+from search_trace import SearchTrace
+from utils import get_solution_path, board_to_grid_string, write_results, \
+    evaluate_bidirectional_children, join_bidirectional_path, get_front_to_front_heuristic, prepare_performance_file
+
+
+def main(file_path):
+    """
+    Read file, retrieve puzzle info, and execute bidirectional search for each puzzle.
+    Without heuristic both frontiers are expanded breadth-first
+    :param (string) file_path: relative path the input file
+    :return: void
+    """
+    heuristics = [ZERO_HEURISTIC, COUNT_HEURISTIC, DIV_BY_5_HEURISTIC, NO_DOUBLE_PRESS_HEURISTIC]
+    heuristic = NO_HEURISTIC
+    if len(sys.argv) >= 2 and not sys.argv[1].startswith('--'):
+        if sys.argv[1] not in heuristics:
+            print('Invalid heuristic. Accepted heuristics are: {}'.format(heuristics))
+            sys.exit()
+        heuristic = sys.argv[1]
+
+    jobs = get_jobs_argument(sys.argv)
+    options = get_search_options(sys.argv)
+    prepare_performance_file(BIDIRECTIONAL_ALGORITHM, heuristic)
+    puzzles = []
+    for puzzle_number, n, max_d, max_l, board, goal in read_puzzles(file_path):
+        puzzles.append({'board': board, 'n': n, 'goal': goal, 'max_l': max_l,
+                        'puzzle_number': puzzle_number, 'heuristic_algorithm': heuristic})
+    run_puzzles(execute_bidirectional, puzzles, BIDIRECTIONAL_ALGORITHM, heuristic, jobs, options)
+
+
+def execute_bidirectional(board: int,
+                          n: int,
+                          goal: int,
+                          max_l: int,
+                          puzzle_number: int,
+                          heuristic_algorithm: str = NO_HEURISTIC,
+                          time_limit: float = TIME_TO_SOLVE_PUZZLE_SECONDS,
+                          trace_every: int = 1,
+                          trace_format: str = TEXT_TRACE_FORMAT) -> tuple:
+    """
+    Wrapper function to run bidirectional search
+    :param board: bitboard representation of the input board.
+    :param n: grid size
+    :param goal: goal bitboard
+    :param max_l: maximum search path length
+    :param puzzle_number: line number of the puzzle
+    :param heuristic_algorithm: Front-to-front heuristic, no-h for breadth-first expansion
+    :param time_limit: seconds allowed for the search
+    :param trace_every: write one every trace_every searched nodes to the search file, 0 disables it
+    :param trace_format: write the text search file, the binary one or both
+    :return: performance data of the run, see gather_performance
+    """
+    print("Executing bidirectional search with heuristic {} and max search length of {} on the grid\n{}".format(
+        heuristic_algorithm, max_l, board_to_grid_string(board, n)))
+    search_path = SearchTrace(puzzle_number, BIDIRECTIONAL_ALGORITHM, heuristic_algorithm, n, trace_every,
+                              trace_format)
+    root_node = Node(board, 1)
+    goal_node = Node(goal, 1)
+
+    start_time = time.time()
+    try:
+        if is_solvable(board, n):
+            solution_path = bidirectional(root_node, goal_node, search_path, max_l, heuristic_algorithm, n,
+                                          start_time + time_limit)
+        else:
+            solution_path = NO_SOLUTION
+    except SearchTimeout:
+        solution_path = NO_SOLUTION
+    finally:
+        search_path.close()
+    end_time = time.time()
+    write_results(puzzle_number, BIDIRECTIONAL_ALGORITHM, heuristic_algorithm, solution_path)
+    print('Found no solution' if solution_path == constant.NO_SOLUTION
+          else 'Found solution in {} moves'.format(len(solution_path) - 1))
+    return puzzle_number, n, solution_path, len(search_path), start_time, end_time, 0
+
+
+def bidirectional(root_node: Node,
+                  goal_node: Node,
+                  search_path: SearchTrace,
+                  max_l,
+                  heuristic,
+                  n,
+                  allowed_execution_time) -> List[str]:
+    """
+    Runs the bidirectional search algorithm. Expands the smaller frontier one layer at a time,
+    from the puzzle and from the goal, until both frontiers meet.
+    Breadth-first, the whole layer is expanded to keep the shortest meeting, which is optimal.
+    With a heuristic, the layer is expanded by increasing front-to-front h(n) and the first meeting is kept
+    :param root_node: node of the input board
+    :param goal_node: node of the goal board
+    :param search_path: Search trace of the searched nodes
+    :param max_l: maximum search path length
+    :param heuristic: Front-to-front heuristic, no-h for breadth-first expansion
+    :param n: grid size
+    :param allowed_execution_time: maximum time to solve a puzzle
+    :return: Solution path if available, else returns a string indicating failure to find a solution
+    """
+    if root_node.board == goal_node.board:
+        search_path.append(root_node)
+        return get_solution_path(root_node, n)
+
+    forward_seen = {root_node.board: root_node}
+    backward_seen = {goal_node.board: goal_node}
+    forward_layer = [root_node]
+    backward_layer = [goal_node]
+    while len(forward_layer) > 0 and len(backward_layer) > 0:
+        is_forward = len(forward_layer) <= len(backward_layer)
+        layer, other_layer = (forward_layer, backward_layer) if is_forward else (backward_layer, forward_layer)
+        seen, other_seen = (forward_seen, backward_seen) if is_forward else (backward_seen, forward_seen)
+        if heuristic != NO_HEURISTIC:
+            for node in layer:
+                node.hn = get_front_to_front_heuristic(heuristic, node.board, other_layer)
+            layer.sort(key=lambda layer_node: (layer_node.get_hn(), layer_node.board))
+
+        next_layer = []
+        best_meeting = None
+        for node in layer:
+            search_path.append(node)
+            if len(search_path) >= max_l or time.time() >= allowed_execution_time:
+                return NO_SOLUTION
+            meeting = evaluate_bidirectional_children(next_layer, seen, other_seen, node, n)
+            if meeting is not None and (best_meeting is None or meeting[1].depth < best_meeting[1].depth):
+                best_meeting = meeting
+                if heuristic != NO_HEURISTIC:
+                    break
+        if best_meeting is not None:
+            forward_node, backward_node = best_meeting if is_forward else (best_meeting[1], best_meeting[0])
+            print('Search path length: {}'.format(len(search_path)))
+            return get_solution_path(join_bidirectional_path(forward_node, backward_node), n)
+
+        if is_forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+    return NO_SOLUTION
+
+
+if __name__ == '__main__':
+    main('input.txt')
@@ -0,0 +1,116 @@
+# -----------------------------------------------------------
+# binary_trace.py 22/01/20
+#
+# Define the compact binary search trace format and a reader rendering it back to text
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import struct
+import sys
+from typing import BinaryIO, Iterator, Tuple, Union
+
+from utils import board_to_string, format_search_move
+
+BINARY_TRACE_MAGIC = b'FLPT'
+BINARY_TRACE_VERSION = 1
+# magic, version, n
+HEADER_FORMAT = struct.Struct('<4sBB')
+# h(n) is an integer, h(n), g(n). f(n) is recomputed as h(n) + g(n)
+RECORD_FORMAT = struct.Struct('<?dI')
+
+
+def get_board_bytes(n: int) -> int:
+    """
+    Get the number of bytes of a packed board
+    :param n: grid size
+    :return: number of bytes
+    """
+    return (n * n + 7) // 8
+
+
+def write_binary_header(fp: BinaryIO, n: int, algorithm: str, heuristic: str):
+    """
+    Write the header of a binary search trace: magic, version, n, then the length prefixed
+    algorithm and heuristic names
+    :param fp: binary file open for writing
+    :param n: grid size
+    :param algorithm: Algorithm used for the current run
+    :param heuristic: Heuristic used to solve puzzle
+    :return: void
+    """
+    fp.write(HEADER_FORMAT.pack(BINARY_TRACE_MAGIC, BINARY_TRACE_VERSION, n))
+    for name in [algorithm, heuristic]:
+        encoded = name.encode('ascii')
+        fp.write(bytes([len(encoded)]) + encoded)
+
+
+def pack_search_record(hn: Union[int, float], gn: int, board: int, n: int) -> bytes:
+    """
+    Pack a searched node into a fixed-width record
+    :param hn: h(n) as written in the text search file
+    :param gn: g(n) as written in the text search file
+    :param board: bitboard representation of the grid
+    :param n: grid size
+    :return: binary record
+    """
+    return RECORD_FORMAT.pack(isinstance(hn, int), hn, gn) + board.to_bytes(get_board_bytes(n), 'big')
+
+
+def read_binary_header(fp: BinaryIO) -> Tuple[int, str, str]:
+    """
+    Read the header of a binary search trace
+    :param fp: binary file open for reading
+    :return: n, algorithm and heuristic
+    """
+    magic, version, n = HEADER_FORMAT.unpack(fp.read(HEADER_FORMAT.size))
+    if magic != BINARY_TRACE_MAGIC or version != BINARY_TRACE_VERSION:
+        raise ValueError('Not a version {} binary search trace'.format(BINARY_TRACE_VERSION))
+    names = []
+    for i in range(2):
+        length = fp.read(1)[0]
+        names.append(fp.read(length).decode('ascii'))
+    return n, names[0], names[1]
+
+
+def read_binary_trace(fp: BinaryIO) -> Iterator[str]:
+    """
+    Render a binary search trace back to the lines of the text search file
+    :param fp: binary file open for reading
+    :return: generator of search moves
+    """
+    n, algorithm, heuristic = read_binary_header(fp)
+    board_bytes = get_board_bytes(n)
+    record_size = RECORD_FORMAT.size + board_bytes
+    while True:
+        record = fp.read(record_size)
+        if len(record) < record_size:
+            return
+        is_int, hn, gn = RECORD_FORMAT.unpack_from(record)
+        hn = int(hn) if is_int else hn
+        board = int.from_bytes(record[RECORD_FORMAT.size:], 'big')
+        yield format_search_move(hn + gn, gn, hn, board_to_string(board, n, ''))
+
+
+def main(file_paths):
+    """
+    Print binary search traces in the text search file layout.
+    With --convert, write each one next to the binary file with a .txt extension instead
+    :param file_paths: binary search trace files, optionally preceded by --convert
+    :return: void
+    """
+    convert = '--convert' in file_paths
+    for file_path in [path for path in file_paths if path != '--convert']:
+        with open(file_path, 'rb') as fp:
+            if not convert:
+                for line in read_binary_trace(fp):
+                    print(line)
+                continue
+            text_path = (file_path[:-len('.bin')] if file_path.endswith('.bin') else file_path) + '.txt'
+            with open(text_path, 'w') as out:
+                for line in read_binary_trace(fp):
+                    out.write('{}\n'.format(line))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,108 @@
+# -----------------------------------------------------------
+# bloom_filter.py 22/01/20
+#
+# Define the memory-capped approximate closed set of the graph searches
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import math
+from typing import Hashable
+
+HASH_COUNT = 4
+MASK_64 = (1 << 64) - 1
+
+
+class BloomFilter:
+    """
+    Set of reached boards held in a fixed number of bytes. A board never added can be reported as reached
+    (false positive) and is then not searched, a reached board is always reported as reached
+    """
+    bits: bytearray
+    size: int
+    count: int
+    set_bits: int
+
+    def __init__(self, byte_budget: int):
+        """
+        Generate BloomFilter object
+        :param byte_budget: number of bytes of the bit array
+        """
+        self.bits = bytearray(byte_budget)
+        self.size = byte_budget * 8
+        self.count = 0
+        self.set_bits = 0
+
+    def get_positions(self, key: Hashable):
+        """
+        Get the bits of a key, by double hashing of its mixed hash
+        :param key: board key, see get_state_key
+        :return: HASH_COUNT bit positions
+        """
+        mixed = (hash(key) & MASK_64) * 0x9E3779B97F4A7C15 & MASK_64
+        first = mixed >> 32
+        step = (mixed & 0xFFFFFFFF) | 1
+        return [(first + i * step) % self.size for i in range(HASH_COUNT)]
+
+    def add(self, key: Hashable):
+        """
+        Record a key as reached
+        :param key: board key, see get_state_key
+        :return: void
+        """
+        for position in self.get_positions(key):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] >> bit & 1:
+                self.bits[byte] |= 1 << bit
+                self.set_bits += 1
+        self.count += 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        """
+        Check if a key was reached, or shares all its bits with reached keys
+        :param key: board key, see get_state_key
+        :return: True if the key is reported as reached
+        """
+        for position in self.get_positions(key):
+            if not self.bits[position >> 3] >> (position & 7) & 1:
+                return False
+        return True
+
+    def __setitem__(self, key: Hashable, depth: int):
+        """
+        Mapping interface of the dfs closed dictionary. The depth is not kept
+        :param key: board key, see get_state_key
+        :param depth: depth the board was reached with
+        :return: void
+        """
+        self.add(key)
+
+    def __getitem__(self, key: Hashable) -> int:
+        """
+        Mapping interface of the dfs closed dictionary. The depth is not kept,
+        so a reached board is never searched again, even from a lower depth
+        :param key: board key, see get_state_key
+        :return: 0, lower than any depth
+        """
+        return 0
+
+    def __len__(self) -> int:
+        """
+        :return: number of keys added
+        """
+        return self.count
+
+    def get_false_positive_rate(self) -> float:
+        """
+        Estimate the probability that a board never added is reported as reached,
+        from the fraction of bits set
+        :return: false positive rate
+        """
+        return math.pow(self.set_bits / self.size, HASH_COUNT) if self.size > 0 else 1.0
+
+    def get_memory_size(self) -> int:
+        """
+        Get the number of bytes of the bit array, fixed whatever the number of boards added
+        :return: memory size in bytes
+        """
+        return len(self.bits)
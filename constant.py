@@ -8,21 +8,54 @@
 # -----------------------------------------------------------
 from typing import List, Set
 
-import numpy
-
 NO_SOLUTION = 'no solution'
 DOUBLE_PRESS = -1
+NO_MOVE = -1
 TIME_TO_SOLVE_PUZZLE_SECONDS = 3 * 60
+TRANSPOSITION_TABLE_SIZE = 1 << 20
+FRONT_TO_FRONT_SAMPLE_SIZE = 64
+GOAL_EXPANSION_SIZE = 1 << 21
+SOLUTION_CACHE_ENTRIES = 100000
+ANYTIME_INITIAL_WEIGHT = 3.0
+ANYTIME_WEIGHT_STEP = 0.5
+SOLUTION_TABLE_MAX_SIZE = 5
+HDA_STAR_BATCH_SIZE = 64
+HDA_STAR_IDLE_SECONDS = 0.001
+HDA_STAR_RESULT_SECONDS = 0.1
+BEAM_WIDTH = 64
+BEAM_WIDTH_FACTOR = 2
 
 SEARCH_FILE_TEMPLATE = 'output/search/{}/{}_{}_search.txt'
+BINARY_SEARCH_FILE_TEMPLATE = 'output/search/{}/{}_{}_search.bin'
 SOLUTION_FILE_TEMPLATE = 'output/solution/{}/{}_{}_solution.txt'
+SOLUTION_TABLE_TEMPLATE = 'table/{}_table.bin'
 PERFORMANCE_DIR_TEMPLATE = 'output/performance/{}_{}_performance.txt'
-PERFORMANCE_FILE_HEADER = '{}\t{}\t{}\t{}\t{}\n'
-PERFORMANCE_FILE_LINE = '{}\t{}\t{}\t{}\t{:.10f}\n'
+METRICS_FILE_TEMPLATE = 'output/metrics/{}/{}_{}_metrics.json'
+PERFORMANCE_FILE_HEADER = '{}\t{}\t{}\t{}\t{}\t{}\n'
+PERFORMANCE_FILE_LINE = '{}\t{}\t{}\t{}\t{:.10f}\t{}\n'
+IMPROVEMENTS_FILE_TEMPLATE = 'output/performance/{}/{}_{}_improvements.txt'
+IMPROVEMENTS_FILE_HEADER = '{}\t{}\t{}\t{}\n'
+IMPROVEMENTS_FILE_LINE = '{}\t{}\t{:.10f}\t{}\n'
+
+TEXT_TRACE_FORMAT = 'text'
+BINARY_TRACE_FORMAT = 'binary'
+BOTH_TRACE_FORMATS = 'both'
+
+HEAP_QUEUE = 'heap'
+BUCKET_QUEUE = 'bucket'
 
 DFS_ALGORITHM = 'dfs'
 A_STAR_ALGORITHM = 'astar'
 BEST_FIRST_ALGORITHM = 'bfs'
+LINEAR_ALGORITHM = 'linear'
+IDDFS_ALGORITHM = 'iddfs'
+IDA_STAR_ALGORITHM = 'idastar'
+BIDIRECTIONAL_ALGORITHM = 'bidir'
+GOAL_BATCH_ALGORITHM = 'goal'
+TABLE_ALGORITHM = 'table'
+ANYTIME_ALGORITHM = 'anytime'
+HDA_STAR_ALGORITHM = 'hdastar'
+BEAM_ALGORITHM = 'beam'
 
 NO_HEURISTIC = 'no-h'
 ZERO_HEURISTIC = 'zero-h'
@@ -31,48 +64,60 @@ DIV_BY_5_HEURISTIC = 'div-5-h'
 NO_DOUBLE_PRESS_HEURISTIC = 'no-dbl-press-h'
 
 
+class SearchTimeout(Exception):
+    """
+    Raised to interrupt a search once its time budget is spent
+    """
+
+
+class PuzzleFormatError(ValueError):
+    """
+    Raised when a line of an input file does not describe a puzzle
+    """
+
+
 class Node:
     """
-    Node containing the 2D numpy array and string representations of a grid state,
-    its depth, h(n) and path from the root node
+    Node containing the bitboard representation of a grid state,
+    its depth, h(n) and a reference to its parent node
     """
     # Fields required by all algorithms
-    grid: numpy.ndarray
-    s_grid: str
+    board: int
     depth: int
-    path_from_root: List[str]
+    parent: 'Node'
+    move: int
 
     # Fields only required by informed heuristics
     hn: float
     black_tokens: int
-    move_history: Set[str]
+    pressed_cells: int
 
     def __init__(self,
-                 grid: numpy.ndarray,
-                 s_grid: str,
+                 board: int,
                  depth: int,
-                 path_from_root: List[str],
+                 parent: 'Node' = None,
+                 move: int = NO_MOVE,
                  # optional, only for informed search
                  hn: float = 0,
                  black_tokens: int = 0,
-                 move_history: Set[str] = None):
+                 pressed_cells: int = 0):
         """
         Generate Node object
-        :param grid: 2D numpy array representation of the state
-        :param s_grid: String representation of the state
+        :param board: Bitboard representation of the state, first cell is the most significant bit
         :param depth: Depth of the state
-        :param path_from_root: Path from the root to the state
+        :param parent: Node this state was generated from, None for the root node
+        :param move: Index (row * n + col) of the cell pressed to reach this state from its parent
         :param hn: h(n) of the state
         :param black_tokens: Number of black tokens in the state
-        :param move_history: history of (row,col) moves from the root node
+        :param pressed_cells: bitmask of the cells pressed from the root node
         """
-        self.grid = grid
-        self.s_grid = s_grid
+        self.board = board
         self.depth = depth
-        self.path_from_root = path_from_root
+        self.parent = parent
+        self.move = move
         self.hn = hn
         self.black_tokens = black_tokens
-        self.move_history = move_history
+        self.pressed_cells = pressed_cells
 
     def get_hn(self):
         return self.hn
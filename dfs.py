@@ -6,11 +6,18 @@
 # Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
 # All rights reserved.
 # -----------------------------------------------------------
+import sys
 import time
 
 import constant
+from batch import get_jobs_argument, get_search_options, run_puzzles
+from bloom_filter import BloomFilter
+from linear_algebra import is_solvable
+from puzzle_loader import read_puzzles
+from search_metrics import SearchMetrics, HEAP_PHASE, SERIALIZATION_PHASE
+from search_trace import SearchTrace
+from solution_cache import get_cache_key, get_cached_performance, store_performance
 from utils import *
-from utils import get_puzzle_info
 
 
 def main(file_path):
@@ -19,72 +26,122 @@ def main(file_path):
     :param (string) file_path: relative path to the input file
     :return: void
     """
+    jobs = get_jobs_argument(sys.argv)
+    options = get_search_options(sys.argv)
     prepare_performance_file(DFS_ALGORITHM, NO_HEURISTIC)
-    with open(file_path) as fp:
-        for puzzle_number, puzzle in enumerate(fp):
-            max_d, max_l, grid, goal = get_puzzle_info(puzzle)
-            execute_dfs(grid, max_d, goal, puzzle_number)
+    puzzles = []
+    for puzzle_number, n, max_d, max_l, board, goal in read_puzzles(file_path):
+        puzzles.append({'board': board, 'n': n, 'max_d': max_d, 'goal': goal, 'puzzle_number': puzzle_number})
+    run_puzzles(execute_dfs, puzzles, DFS_ALGORITHM, NO_HEURISTIC, jobs, options)
 
 
-def execute_dfs(grid, max_d, goal, puzzle_number):
+def execute_dfs(board, n, max_d, goal, puzzle_number, time_limit=TIME_TO_SOLVE_PUZZLE_SECONDS, trace_every=1,
+                trace_format=TEXT_TRACE_FORMAT, symmetry=False, ordered=False, closed_bytes=0, metrics_every=0,
+                cache='', cache_entries=SOLUTION_CACHE_ENTRIES, cache_search=False):
     """
     Wrapper for DFS
-    :param (ndarray) grid: numpy 2-D array representation of the input board
+    :param (int) board: bitboard representation of the input board
+    :param (int) n: grid size
     :param (int) max_d: maximum depth
-    :param (string) goal: serialized goal grid
+    :param (int) goal: goal bitboard
     :param (int) puzzle_number: line number of the puzzle for which DFS is executed
-    :return: void
+    :param (float) time_limit: seconds allowed for the search
+    :param (int) trace_every: write one every trace_every searched nodes to the search file, 0 disables it
+    :param (string) trace_format: write the text search file, the binary one or both
+    :param (bool) symmetry: if True, rotations and reflections of a visited board are not searched again
+    :param (bool) ordered: if True, presses are only made in increasing cell order
+    :param (int) closed_bytes: if not 0, the visited boards are kept in a Bloom filter of this many bytes
+    :param (int) metrics_every: sample one every metrics_every expansions to the metrics file, 0 disables it
+    :param (string) cache: if not empty, SQLite file of the solution cache looked up before searching
+    :param (int) cache_entries: number of results kept in the solution cache
+    :param (bool) cache_search: if True, search again on a cache hit, writing the search file and refreshing the result
+    :return (tuple): performance data of the run, see gather_performance
     """
-    print('Execute DFS with max depth {} on grid \n{} '.format(max_d, grid))
+    print('Execute DFS with max depth {} on grid \n{} '.format(max_d, board_to_grid_string(board, n)))
+    cache_key = get_cache_key(n, board, DFS_ALGORITHM, NO_HEURISTIC, max_d,
+                              {'symmetry': symmetry, 'ordered': ordered, 'closed_bytes': closed_bytes})
+    if cache and not cache_search:
+        performance = get_cached_performance(cache, cache_entries, cache_key, puzzle_number, DFS_ALGORITHM,
+                                             NO_HEURISTIC)
+        if performance is not None:
+            return performance
     open_list = []
     open_set = set()
-    closed_dict = {}
-    search_path = []
-
-    s_grid = grid_to_string(grid)
-    path_to_root = ['{}   {}'.format(0, s_grid)]
+    closed_dict = BloomFilter(closed_bytes) if closed_bytes > 0 else {}
+    search_path = SearchTrace(puzzle_number, DFS_ALGORITHM, NO_HEURISTIC, n, trace_every, trace_format)
+    metrics = SearchMetrics(puzzle_number, DFS_ALGORITHM, NO_HEURISTIC, metrics_every)
 
-    root = Node(grid, s_grid, 1, path_to_root)
+    root = Node(board, 1)
     open_list.append(root)
-    open_set.add(s_grid)
+    open_set.add(get_state_key(board, NO_MOVE, n, symmetry, ordered))
+    solvable = is_solvable(board, n)
     start_time = time.time()
-    solution_path = dfs(open_list, open_set, closed_dict, search_path, goal, max_d,
-                        start_time + TIME_TO_SOLVE_PUZZLE_SECONDS)
+    try:
+        if solvable:
+            solution_path = dfs(open_list, open_set, closed_dict, search_path, metrics, goal, max_d, n,
+                                start_time + time_limit, symmetry, ordered)
+        else:
+            solution_path = constant.NO_SOLUTION
+    except SearchTimeout:
+        solution_path = constant.NO_SOLUTION
+    finally:
+        search_path.close()
     end_time = time.time()
-    write_results(puzzle_number, DFS_ALGORITHM, NO_HEURISTIC, solution_path, search_path)
-    gather_performance(puzzle_number, np.size(grid, 0), solution_path, len(search_path),
-                       start_time, end_time, DFS_ALGORITHM, NO_HEURISTIC)
+    closed_set_memory = get_closed_set_memory(closed_dict)
+    metrics.close(len(open_list), len(closed_dict), closed_set_memory)
+    if isinstance(closed_dict, BloomFilter):
+        print('Closed set false positive rate: {:.6f}'.format(closed_dict.get_false_positive_rate()))
+    write_results(puzzle_number, DFS_ALGORITHM, NO_HEURISTIC, solution_path)
     print('Found no solution' if solution_path == constant.NO_SOLUTION
           else 'Found result in {} moves'.format(len(solution_path) - 1))
+    performance = puzzle_number, n, solution_path, len(search_path), start_time, end_time, closed_set_memory
+    # A search stopped by its bound or by the time budget is not cached, it could succeed with a larger one
+    if cache and (solution_path != NO_SOLUTION or not solvable):
+        store_performance(cache, cache_entries, cache_key, performance)
+    return performance
 
 
-def dfs(open_list: List[Node], open_set, closed_dict, search_path, goal, max_d, allowed_execution_time):
+def dfs(open_list: List[Node], open_set, closed_dict, search_path, metrics, goal, max_d, n, allowed_execution_time,
+        symmetry=False, ordered=False):
     """
     Iterative DFS.
-    Each node in the open list carries: grid, level and a solution_path up to this grid
+    Each node in the open list carries: grid, level and a reference to its parent node
     :param (stack) open_list: stack of yet to be processed grids
     :param (set) open_set: keep track of the configurations in the open_list
     :param (dictionary) closed_dict: visited grid configurations and their depth
-    :param (list) search_path: path up to the specific node
-    :param (string) goal: goal configuration
+    :param (SearchTrace) search_path: search trace of the searched nodes
+    :param (SearchMetrics) metrics: counters of the expansions
+    :param (int) goal: goal bitboard
     :param (int) max_d: maximum execution depth
+    :param (int) n: grid size
     :param allowed_execution_time: maximum time to solve a puzzle
+    :param (bool) symmetry: if True, the sets are keyed by canonical board, see get_state_key
+    :param (bool) ordered: if True, presses are made in increasing cell order, see get_child_moves
     :return (list | string): path up to identified solution. List of paths or 'no solution'
     """
     while len(open_list) > 0:
+        sample = metrics.start_expansion()
         node = open_list.pop()
 
-        open_set.remove(node.s_grid)
-        closed_dict[node.s_grid] = node.depth
-        search_path.append(get_search_move(constant.DFS_ALGORITHM, node))
-        if node.s_grid == goal:
-            return node.path_from_root
+        node_key = get_state_key(node.board, node.move, n, symmetry, ordered)
+        open_set.remove(node_key)
+        closed_dict[node_key] = node.depth
+        if sample is not None:
+            sample.lap(HEAP_PHASE)
+        search_path.append(node)
+        if sample is not None:
+            sample.lap(SERIALIZATION_PHASE)
+        if node.board == goal:
+            return get_solution_path(node, n)
         if node.depth < max_d:
-            evaluate_dfs_children(open_list, open_set, closed_dict, node)
+            generated, added = evaluate_dfs_children(open_list, open_set, closed_dict, node, n, symmetry, ordered,
+                                                     sample)
+            metrics.end_expansion(generated, added, len(open_list), len(closed_dict))
         if time.time() >= allowed_execution_time:
             return constant.NO_SOLUTION
     return constant.NO_SOLUTION
 
 
-# Define input file here
-main('input.txt')
+if __name__ == '__main__':
+    # Define input file here
+    main('input.txt')
@@ -0,0 +1,133 @@
+# -----------------------------------------------------------
+# experiment.py 22/01/20
+#
+# Define and run a matrix of algorithm and heuristic combinations in a single process
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import sys
+from typing import Dict, List, Tuple
+
+from a_star import execute_a_star
+from anytime import execute_anytime
+from batch import VALUE_ARGUMENTS, FLAG_ARGUMENTS, get_jobs_argument, get_search_options, run_tasks
+from beam import execute_beam
+from bfs import execute_bfs
+from bidirectional import execute_bidirectional
+from constant import DFS_ALGORITHM, A_STAR_ALGORITHM, BEST_FIRST_ALGORITHM, LINEAR_ALGORITHM, IDDFS_ALGORITHM, \
+    IDA_STAR_ALGORITHM, BIDIRECTIONAL_ALGORITHM, TABLE_ALGORITHM, ANYTIME_ALGORITHM, HDA_STAR_ALGORITHM, \
+    BEAM_ALGORITHM, NO_HEURISTIC, ZERO_HEURISTIC, COUNT_HEURISTIC, DIV_BY_5_HEURISTIC, NO_DOUBLE_PRESS_HEURISTIC
+from dfs import execute_dfs
+from hda_star import execute_hda_star
+from ida_star import execute_ida_star
+from iddfs import execute_iddfs
+from linear import execute_linear
+from linear_algebra import get_flip_basis
+from puzzle_loader import read_puzzles
+from solution_table import get_solution_table
+from table import execute_table
+from utils import get_flip_masks, prepare_performance_file
+
+HEURISTICS = [ZERO_HEURISTIC, COUNT_HEURISTIC, DIV_BY_5_HEURISTIC, NO_DOUBLE_PRESS_HEURISTIC]
+EXECUTE_FUNCTIONS = {
+    DFS_ALGORITHM: execute_dfs,
+    A_STAR_ALGORITHM: execute_a_star,
+    BEST_FIRST_ALGORITHM: execute_bfs,
+    LINEAR_ALGORITHM: execute_linear,
+    IDDFS_ALGORITHM: execute_iddfs,
+    IDA_STAR_ALGORITHM: execute_ida_star,
+    BIDIRECTIONAL_ALGORITHM: execute_bidirectional,
+    TABLE_ALGORITHM: execute_table,
+    ANYTIME_ALGORITHM: execute_anytime,
+    HDA_STAR_ALGORITHM: execute_hda_star,
+    BEAM_ALGORITHM: execute_beam,
+}
+# Algorithms bounded by max_d and running without heuristic, the others are bounded by max_l
+DEPTH_BOUNDED_ALGORITHMS = [DFS_ALGORITHM, IDDFS_ALGORITHM]
+HEURISTIC_ALGORITHMS = [A_STAR_ALGORITHM, BEST_FIRST_ALGORITHM, IDA_STAR_ALGORITHM, ANYTIME_ALGORITHM,
+                        HDA_STAR_ALGORITHM, BEAM_ALGORITHM]
+# Algorithms running with or without heuristic, bounded by max_l
+OPTIONAL_HEURISTIC_ALGORITHMS = [BIDIRECTIONAL_ALGORITHM]
+DEFAULT_COMBINATIONS = [(DFS_ALGORITHM, NO_HEURISTIC)] \
+                       + [(A_STAR_ALGORITHM, heuristic) for heuristic in HEURISTICS] \
+                       + [(BEST_FIRST_ALGORITHM, heuristic) for heuristic in HEURISTICS] \
+                       + [(LINEAR_ALGORITHM, NO_HEURISTIC)]
+ALL_COMBINATIONS = DEFAULT_COMBINATIONS \
+                   + [(IDDFS_ALGORITHM, NO_HEURISTIC)] \
+                   + [(IDA_STAR_ALGORITHM, heuristic) for heuristic in HEURISTICS] \
+                   + [(BIDIRECTIONAL_ALGORITHM, heuristic) for heuristic in [NO_HEURISTIC] + HEURISTICS] \
+                   + [(TABLE_ALGORITHM, NO_HEURISTIC)] \
+                   + [(ANYTIME_ALGORITHM, heuristic) for heuristic in HEURISTICS] \
+                   + [(HDA_STAR_ALGORITHM, heuristic) for heuristic in HEURISTICS] \
+                   + [(BEAM_ALGORITHM, heuristic) for heuristic in HEURISTICS]
+
+
+def main(file_path):
+    """
+    Read file once, then execute every algorithm and heuristic combination on each puzzle
+    :param (string) file_path: relative path to the input file
+    :return: void
+    """
+    combinations = get_combinations(sys.argv[1:])
+    jobs = get_jobs_argument(sys.argv)
+    options = get_search_options(sys.argv)
+
+    puzzles = []
+    for puzzle_number, n, max_d, max_l, board, goal in read_puzzles(file_path):
+        # Warm the per grid size caches before the worker processes are forked
+        get_flip_masks(n)
+        get_flip_basis(n)
+        get_solution_table(n)
+        puzzles.append((puzzle_number, n, max_d, max_l, board, goal))
+
+    for algorithm, heuristic in combinations:
+        prepare_performance_file(algorithm, heuristic)
+    # Puzzle-major order spreads the expensive puzzles of every combination across the workers
+    tasks = [(EXECUTE_FUNCTIONS[algorithm], get_execute_arguments(algorithm, heuristic, *puzzle),
+              algorithm, heuristic)
+             for puzzle in puzzles for algorithm, heuristic in combinations]
+    run_tasks(tasks, jobs, options)
+
+
+def get_combinations(args: List[str]) -> List[Tuple[str, str]]:
+    """
+    Parse the algorithm and heuristic combinations from the command line
+    Example: ['dfs', 'astar:count-h', '--jobs', '4'] => [('dfs', 'no-h'), ('astar', 'count-h')]
+    :param args: command line arguments, without the script name
+    :return: combinations to run, the default ones if none is given
+    """
+    combinations = []
+    for index, arg in enumerate(args):
+        if arg in VALUE_ARGUMENTS + FLAG_ARGUMENTS or (index > 0 and args[index - 1] in VALUE_ARGUMENTS):
+            continue
+        algorithm, _, heuristic = arg.partition(':')
+        if algorithm in EXECUTE_FUNCTIONS and algorithm not in HEURISTIC_ALGORITHMS \
+                and heuristic in ['', NO_HEURISTIC]:
+            combinations.append((algorithm, NO_HEURISTIC))
+        elif algorithm in HEURISTIC_ALGORITHMS + OPTIONAL_HEURISTIC_ALGORITHMS and heuristic in HEURISTICS:
+            combinations.append((algorithm, heuristic))
+        else:
+            print('Invalid combination {}. Accepted combinations are: {}'.format(
+                arg, ['{}:{}'.format(*combination) for combination in ALL_COMBINATIONS]))
+            sys.exit()
+    return combinations if len(combinations) > 0 else DEFAULT_COMBINATIONS
+
+
+def get_execute_arguments(algorithm: str, heuristic: str, puzzle_number: int, n: int, max_d: int, max_l: int,
+                          board: int, goal: int) -> Dict:
+    """
+    Get the keyword arguments of the execute wrapper of an algorithm for a puzzle
+    :return: keyword arguments of the execute wrapper
+    """
+    if algorithm in DEPTH_BOUNDED_ALGORITHMS:
+        return {'board': board, 'n': n, 'max_d': max_d, 'goal': goal, 'puzzle_number': puzzle_number}
+    if algorithm in [LINEAR_ALGORITHM, TABLE_ALGORITHM]:
+        return {'board': board, 'n': n, 'puzzle_number': puzzle_number}
+    return {'board': board, 'n': n, 'goal': goal, 'max_l': max_l,
+            'puzzle_number': puzzle_number, 'heuristic_algorithm': heuristic}
+
+
+if __name__ == '__main__':
+    # Define input file here
+    main('input.txt')
@@ -0,0 +1,161 @@
+# -----------------------------------------------------------
+# goal_batch.py 22/01/20
+#
+# Define and run a breadth-first expansion from the goal shared by the puzzles of a same size
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from batch import get_jobs_argument, get_search_options, run_puzzles
+from constant import NO_SOLUTION, NO_HEURISTIC, NO_MOVE, Node, GOAL_BATCH_ALGORITHM, IDDFS_ALGORITHM, \
+    GOAL_EXPANSION_SIZE, TIME_TO_SOLVE_PUZZLE_SECONDS
+from iddfs import execute_iddfs
+from linear_algebra import is_solvable
+from puzzle_loader import read_puzzles
+from utils import get_flip_masks, get_solution_path, write_results, gather_performance, \
+    get_closed_set_memory, prepare_performance_file
+
+
+def main(file_path):
+    """
+    Read file and group the puzzles by grid size. Each group is answered by a single expansion from the goal,
+    the puzzles it does not cover are solved one by one with iddfs
+    :param (string) file_path: relative path to the input file
+    :return: void
+    """
+    jobs = get_jobs_argument(sys.argv)
+    options = get_search_options(sys.argv)
+    groups: Dict[int, List[Dict]] = {}
+    for puzzle_number, n, max_d, max_l, board, goal in read_puzzles(file_path):
+        groups.setdefault(n, []).append({'board': board, 'n': n, 'max_d': max_d, 'goal': goal,
+                                         'puzzle_number': puzzle_number})
+
+    prepare_performance_file(GOAL_BATCH_ALGORITHM, NO_HEURISTIC)
+    performances = []
+    fallback_puzzles = []
+    for n, puzzles in groups.items():
+        resolved, unresolved = execute_goal_batch(puzzles, n)
+        performances.extend(resolved)
+        fallback_puzzles.extend(unresolved)
+    for performance in sorted(performances):
+        gather_performance(*performance, GOAL_BATCH_ALGORITHM, NO_HEURISTIC)
+
+    if len(fallback_puzzles) > 0:
+        prepare_performance_file(IDDFS_ALGORITHM, NO_HEURISTIC)
+        fallback_puzzles.sort(key=lambda fallback_puzzle: fallback_puzzle['puzzle_number'])
+        run_puzzles(execute_iddfs, fallback_puzzles, IDDFS_ALGORITHM, NO_HEURISTIC, jobs, options)
+
+
+def execute_goal_batch(puzzles, n, time_limit=TIME_TO_SOLVE_PUZZLE_SECONDS, expansion_size=GOAL_EXPANSION_SIZE):
+    """
+    Wrapper for the goal expansion of a group of puzzles of the same size.
+    Writes the solution file of every puzzle it answers
+    :param (list) puzzles: keyword arguments of execute_iddfs for each puzzle of the group
+    :param (int) n: grid size
+    :param (float) time_limit: seconds allowed for the whole group
+    :param (int) expansion_size: maximum number of boards reached by the expansion
+    :return (tuple): performance data of each answered puzzle, see gather_performance,
+                     and the puzzles left to the per-puzzle search
+    """
+    print('Execute goal expansion on {} puzzles of size {}'.format(len(puzzles), n))
+    start_time = time.time()
+    queries = {}
+    resolved = []
+    for puzzle in puzzles:
+        if is_solvable(puzzle['board'], n):
+            queries.setdefault(puzzle['board'], []).append(puzzle)
+        else:
+            write_results(puzzle['puzzle_number'], GOAL_BATCH_ALGORITHM, NO_HEURISTIC, NO_SOLUTION)
+            resolved.append((puzzle['puzzle_number'], n, NO_SOLUTION, 0, start_time, time.time(), 0))
+
+    max_d = max([puzzle['max_d'] for query in queries.values() for puzzle in query], default=0)
+    reached, searched, completed_depth = goal_expansion(set(queries), n, max_d, expansion_size,
+                                                        start_time + time_limit)
+    searched_memory = get_closed_set_memory(searched)
+    unresolved = []
+    for board, query in queries.items():
+        for puzzle in query:
+            puzzle_number = puzzle['puzzle_number']
+            if board in reached and reached[board][0] <= puzzle['max_d']:
+                _, end_time, search_length = reached[board]
+                solution_path = get_solution_path(get_goal_path(board, searched, n), n)
+            elif board in reached or puzzle['max_d'] <= completed_depth:
+                # Breadth-first, the puzzle is not within max_d of the goal
+                end_time, search_length = time.time(), len(searched)
+                solution_path = NO_SOLUTION
+            else:
+                unresolved.append(puzzle)
+                continue
+            write_results(puzzle_number, GOAL_BATCH_ALGORITHM, NO_HEURISTIC, solution_path)
+            resolved.append((puzzle_number, n, solution_path, search_length, start_time, end_time, searched_memory))
+    print('Answered {} puzzles, {} left to iddfs'.format(len(resolved), len(unresolved)))
+    return resolved, unresolved
+
+
+def goal_expansion(query_boards, n, max_d, expansion_size, allowed_execution_time) \
+        -> Tuple[Dict[int, Tuple[int, float, int]], Dict[int, int], int]:
+    """
+    Breadth-first expansion from the goal. Every move is its own inverse,
+    so the path from the goal to a board, reversed, solves that board.
+    Only the move each board was reached with is kept, not a Node per board
+    :param (set) query_boards: boards of the puzzles to answer
+    :param (int) n: grid size
+    :param (int) max_d: depth of the deepest puzzle, the goal is at depth 1
+    :param (int) expansion_size: maximum number of boards reached by the expansion
+    :param allowed_execution_time: time at which the expansion stops
+    :return: depth, time and number of reached boards when each query board was reached,
+             move of each reached board, and the last depth whose boards were all reached
+    """
+    flip_masks = get_flip_masks(n)
+    goal = 0
+    searched = {goal: NO_MOVE}
+    reached = {}
+    if goal in query_boards:
+        reached[goal] = (1, time.time(), len(searched))
+    layer = [goal]
+    depth = 1
+    while depth < max_d and len(layer) > 0 and len(reached) < len(query_boards):
+        next_layer = []
+        for board in layer:
+            for index, mask in enumerate(flip_masks):
+                child_board = board ^ mask
+                if child_board in searched:
+                    continue
+                searched[child_board] = index
+                next_layer.append(child_board)
+                if child_board in query_boards:
+                    reached[child_board] = (depth + 1, time.time(), len(searched))
+            if len(searched) >= expansion_size or time.time() >= allowed_execution_time:
+                return reached, searched, depth
+        layer = next_layer
+        depth += 1
+    if len(layer) == 0:
+        # Every solvable board was reached
+        depth = max_d
+    return reached, searched, depth
+
+
+def get_goal_path(board, searched, n) -> Node:
+    """
+    Rebuild the path from a board to the goal by pressing again the move each board was reached with
+    :param (int) board: bitboard reached by the goal expansion
+    :param (dict) searched: move each board was reached with
+    :param (int) n: grid size
+    :return (Node): goal node, end of the path from the board
+    """
+    flip_masks = get_flip_masks(n)
+    node = Node(board, 1)
+    while searched[board] != NO_MOVE:
+        move = searched[board]
+        board ^= flip_masks[move]
+        node = Node(board, node.depth + 1, node, move)
+    return node
+
+
+if __name__ == '__main__':
+    # Define input file here
+    main('input.txt')
@@ -0,0 +1,475 @@
+# -----------------------------------------------------------
+# hda_star.py 22/01/20
+#
+# Define and run hash distributed a* search algorithm, a single puzzle being searched by several processes
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import multiprocessing
+from array import array
+import os
+import queue
+import random
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, List, Tuple, Union
+
+import constant
+from batch import get_jobs_argument, get_search_options, run_puzzles
+from constant import NO_SOLUTION, ZERO_HEURISTIC, COUNT_HEURISTIC, DIV_BY_5_HEURISTIC, \
+    NO_DOUBLE_PRESS_HEURISTIC, NO_MOVE, DOUBLE_PRESS, Node, HDA_STAR_ALGORITHM, TIME_TO_SOLVE_PUZZLE_SECONDS, \
+    TEXT_TRACE_FORMAT, HDA_STAR_BATCH_SIZE, HDA_STAR_IDLE_SECONDS, HDA_STAR_RESULT_SECONDS, SearchTimeout
+from heuristic import get_heuristic
+from linear_algebra import is_solvable
+from open_list import OpenList
+from output_writer import close_output, flush_output
+from puzzle_loader import read_puzzles
+from search_trace import SearchTrace
+from utils import get_solution_path, board_to_grid_string, count_black_tokens, write_results, flip_token, \
+    expand_children, get_white_token_score, get_closed_set_memory, get_flip_masks, get_cell_bit, \
+    prepare_performance_file
+
+# Cost of the best solution before one is found
+NO_INCUMBENT = 2 ** 31 - 1
+# Cells pressed from the root in order, 2 bytes each as a grid can have more than 256 cells
+MOVES_TYPECODE = 'H'
+# Board, hash, cells pressed from the root in order, h(n), black tokens and pressed cells bitmask of a child
+Child = Tuple[int, int, array, float, int, int]
+
+
+class HdaState:
+    """
+    State shared by the workers of a search: one inbox per worker, the cost of the best solution,
+    and the counters of the termination detection. Each worker only writes its own slots
+    """
+
+    def __init__(self, workers: int):
+        """
+        Create the shared state of a search
+        :param workers: number of worker processes
+        """
+        self.workers = workers
+        self.inboxes = [multiprocessing.Queue() for _ in range(workers)]
+        self.results = multiprocessing.Queue()
+        # The last slot of sent counts the root node, sent by the parent process
+        self.sent = multiprocessing.Array('q', workers + 1, lock=False)
+        self.received = multiprocessing.Array('q', workers, lock=False)
+        self.idle = multiprocessing.Array('b', workers, lock=False)
+        self.searched = multiprocessing.Array('q', workers, lock=False)
+        self.incumbent = multiprocessing.Value('i', NO_INCUMBENT)
+        self.stop = multiprocessing.Event()
+
+    def send(self, sender: int, children: List[Child]):
+        """
+        Send children to the worker owning them, counting the message before it is queued
+        :param sender: index of the sending worker
+        :param children: children sharing the same owner, see get_owner
+        :return: void
+        """
+        self.sent[sender] += 1
+        self.inboxes[get_owner(children[0][1], self.workers)].put(children)
+
+    def improve_incumbent(self, depth: int) -> bool:
+        """
+        Lower the cost of the best solution
+        :param depth: depth of a goal node
+        :return: True if the goal node is the best solution so far
+        """
+        with self.incumbent.get_lock():
+            if depth >= self.incumbent.value:
+                return False
+            self.incumbent.value = depth
+            return True
+
+    def is_terminated(self) -> bool:
+        """
+        Check that every worker is idle and no message is in flight. The counters are read before and after
+        the idle flags: a worker only leaves its idle state by receiving a message, which must have been sent
+        :return: True if the search is over
+        """
+        counters = sum(self.sent), sum(self.received)
+        if counters[0] != counters[1] or not all(self.idle):
+            return False
+        return counters == (sum(self.sent), sum(self.received))
+
+
+def main(file_path):
+    """
+    Read file, retrieve puzzle info, and execute hash distributed a* for each puzzle
+    :param (string) file_path: relative path the input file
+    :return: void
+    """
+    heuristics = [ZERO_HEURISTIC, COUNT_HEURISTIC, DIV_BY_5_HEURISTIC, NO_DOUBLE_PRESS_HEURISTIC]
+    if len(sys.argv) < 2 or sys.argv[1] not in heuristics:
+        print('Invalid heuristic. Accepted heuristics are: {}'.format(heuristics))
+        sys.exit()
+
+    heuristic = sys.argv[1]
+    jobs = get_jobs_argument(sys.argv)
+    options = get_search_options(sys.argv)
+    prepare_performance_file(HDA_STAR_ALGORITHM, heuristic)
+    puzzles = []
+    for puzzle_number, n, max_d, max_l, board, goal in read_puzzles(file_path):
+        puzzles.append({'board': board, 'n': n, 'goal': goal, 'max_l': max_l,
+                        'puzzle_number': puzzle_number, 'heuristic_algorithm': heuristic})
+    run_puzzles(execute_hda_star, puzzles, HDA_STAR_ALGORITHM, heuristic, jobs, options)
+
+
+def execute_hda_star(board: int,
+                     n: int,
+                     goal: int,
+                     max_l: int,
+                     puzzle_number: int,
+                     heuristic_algorithm: str,
+                     time_limit: float = TIME_TO_SOLVE_PUZZLE_SECONDS,
+                     trace_every: int = 1,
+                     trace_format: str = TEXT_TRACE_FORMAT,
+                     workers: int = 0) -> tuple:
+    """
+    Wrapper function to run hash distributed A*
+    :param board: bitboard representation of the input board.
+    :param n: grid size
+    :param goal: goal bitboard
+    :param max_l: maximum search path length, over all the workers
+    :param puzzle_number: line number of the puzzle
+    :param heuristic_algorithm: Heuristic algorithm to be used for this run
+    :param time_limit: seconds allowed for the search
+    :param trace_every: write one every trace_every searched nodes to the search file of each worker, 0 disables it
+    :param trace_format: write the text search file, the binary one or both
+    :param workers: number of worker processes, 0 for one per CPU
+    :return: performance data of the run, see gather_performance
+    """
+    if multiprocessing.current_process().daemon:
+        # A pool worker cannot start processes, the search runs in this process
+        workers = 1
+    workers = workers if workers > 0 else os.cpu_count() or 1
+    print("Executing HDA* Algorithm with {} workers, heuristic {} and max search length of {} on the grid\n{}".format(
+        workers, heuristic_algorithm, max_l, board_to_grid_string(board, n)))
+    state = HdaState(workers)
+    moves = None
+    closed_set_memory = 0
+
+    # initialize root node information
+    num_black_tokens = count_black_tokens(board)
+    hn = get_heuristic(heuristic_algorithm, num_black_tokens, 0, 0, 0)
+    root = (board, get_board_hash(board, n), array(MOVES_TYPECODE), hn, num_black_tokens, 0)
+
+    start_time = time.time()
+    try:
+        if is_solvable(board, n):
+            moves, closed_set_memory = run_workers(state, root, goal, max_l, heuristic_algorithm, n,
+                                                   start_time + time_limit, puzzle_number, trace_every, trace_format)
+    except SearchTimeout:
+        # Interrupted in this process, the solutions not yet gathered are lost
+        pass
+    end_time = time.time()
+    solution_path = NO_SOLUTION if moves is None else get_solution_path(get_moves_node(board, n, moves), n)
+    write_results(puzzle_number, HDA_STAR_ALGORITHM, heuristic_algorithm, solution_path)
+    print('Found no solution' if solution_path == constant.NO_SOLUTION
+          else 'Found solution in {} moves'.format(len(solution_path) - 1))
+    return puzzle_number, n, solution_path, sum(state.searched), start_time, end_time, closed_set_memory
+
+
+def run_workers(state: HdaState,
+                root: Child,
+                goal: int,
+                max_l: int,
+                heuristic: str,
+                n: int,
+                allowed_execution_time: float,
+                puzzle_number: int,
+                trace_every: int,
+                trace_format: str) -> Tuple[Union[array, None], int]:
+    """
+    Run a worker per process, or a single one in this process, and gather their solutions
+    :param state: shared state of the search
+    :param root: root node, sent to its owner once the workers are started
+    :param goal: Goal bitboard
+    :param max_l: maximum search path length, over all the workers
+    :param heuristic: Heuristic algorithm to be used for this run
+    :param n: grid size
+    :param allowed_execution_time: maximum time to solve a puzzle
+    :param puzzle_number: line number of the puzzle
+    :param trace_every: write one every trace_every searched nodes to the search file of each worker
+    :param trace_format: write the text search file, the binary one or both
+    :return: presses of the best solution, None if not found, and bytes held by the closed sets
+    """
+    arguments = (state, goal, max_l, heuristic, n, allowed_execution_time, puzzle_number, trace_every, trace_format)
+    # The root is counted before the workers start, else they could all be idle with no message counted,
+    # and stop before it arrives
+    state.sent[state.workers] += 1
+    processes = []
+    if state.workers > 1:
+        # Threads do not survive a fork, the writer is stopped and started again after the workers are created
+        close_output()
+        processes = [multiprocessing.Process(target=hda_star_worker, args=(worker,) + arguments)
+                     for worker in range(state.workers)]
+        for process in processes:
+            process.start()
+    state.inboxes[get_owner(root[1], state.workers)].put([root])
+    if state.workers == 1:
+        hda_star_worker(0, *arguments)
+    best_moves = None
+    closed_set_memory = 0
+    finished = set()
+    dead = set()
+    # Every worker sends its solutions, then its closed set memory once it stopped
+    while len(finished) < state.workers:
+        try:
+            worker, moves, memory = state.results.get(timeout=HDA_STAR_RESULT_SECONDS)
+        except queue.Empty:
+            # A worker that exited without its last message, e.g. killed, is counted as finished once it is still
+            # missing on the next check, a message queued before it exited has then arrived
+            missing = dead - finished
+            if len(missing) > 0:
+                print('Worker {} exited without reporting'.format(', '.join(map(str, sorted(missing)))))
+                state.stop.set()
+                finished |= missing
+            dead = {worker for worker, process in enumerate(processes) if process.exitcode is not None}
+            continue
+        if moves is None:
+            finished.add(worker)
+            closed_set_memory += memory
+        elif best_moves is None or len(moves) < len(best_moves):
+            best_moves = moves
+    for process in processes:
+        process.join()
+    return best_moves, closed_set_memory
+
+
+def hda_star_worker(worker: int,
+                    state: HdaState,
+                    goal: int,
+                    max_l: int,
+                    heuristic: str,
+                    n: int,
+                    allowed_execution_time: float,
+                    puzzle_number: int,
+                    trace_every: int,
+                    trace_format: str):
+    """
+    Worker entry point. Searches the boards it owns, streaming them to its own search file
+    <puzzle>-<worker>_hdastar_search.txt, then reports its closed set memory
+    :param worker: index of the worker
+    :param state: shared state of the search
+    :return: void
+    """
+    # Messages left in flight once the search is stopped are dropped instead of blocking the exit
+    for inbox in state.inboxes:
+        inbox.cancel_join_thread()
+    search_path = SearchTrace('{}-{}'.format(puzzle_number, worker), HDA_STAR_ALGORITHM, heuristic, n, trace_every,
+                              trace_format)
+    closed_dict = {}
+    try:
+        hda_star(worker, state, closed_dict, search_path, goal, max_l, heuristic, n, allowed_execution_time)
+    finally:
+        # The other workers stop as well, e.g. if this one failed
+        state.stop.set()
+        search_path.close()
+        flush_output()
+        state.results.put((worker, None, get_closed_set_memory(closed_dict)))
+
+
+def hda_star(worker: int,
+             state: HdaState,
+             closed_dict: Dict[int, int],
+             search_path: SearchTrace,
+             goal,
+             max_l,
+             heuristic,
+             n,
+             allowed_execution_time):
+    """
+    Runs A* over the boards owned by a worker. Children owned by another worker are sent to it in batches.
+    Nodes arrive out of f(n) order, so a visited board reached again with a lower g(n) is searched again,
+    and the search goes on after a solution until every node left has f(n) no lower than its cost.
+    The solution is the one sequential A* finds for an admissible heuristic: optimal
+    :param worker: index of the worker
+    :param state: shared state of the search
+    :param closed_dict: visited bitboards and the g(n) they were searched with
+    :param search_path: Search trace of the searched nodes
+    :param goal: Goal bitboard
+    :param max_l: maximum search path length, over all the workers
+    :param heuristic: Heuristic algorithm to be used for this run
+    :param n: grid size
+    :param allowed_execution_time: maximum time to solve a puzzle
+    :return: void
+    """
+    open_list = OpenList()
+    paths: Dict[int, Tuple[int, array]] = {}
+    outboxes: List[List[Child]] = [[] for _ in range(state.workers)]
+    press_keys = get_hash_keys(n)[1]
+    incumbent = state.incumbent.value
+    while True:
+        if len(open_list) == 0:
+            for owner, outbox in enumerate(outboxes):
+                if len(outbox) > 0:
+                    state.send(worker, outbox)
+                    outboxes[owner] = []
+            state.idle[worker] = True
+            if state.is_terminated():
+                state.stop.set()
+        if state.stop.is_set():
+            return
+        children = receive_children(state.inboxes[worker], len(open_list) == 0)
+        while children is not None:
+            # Not idle before the message is counted, see is_terminated
+            state.idle[worker] = False
+            state.received[worker] += 1
+            incumbent = state.incumbent.value
+            for child in children:
+                add_child(open_list, closed_dict, paths, incumbent, *child)
+            children = receive_children(state.inboxes[worker], False)
+        if len(open_list) == 0:
+            continue
+
+        node_key, node = open_list.pop()
+        if node.get_fn() >= incumbent:
+            # Every open node is at least as costly as the best solution
+            open_list = OpenList()
+            continue
+        closed_dict[node_key] = node.depth
+        search_path.append(node)
+        state.searched[worker] = len(search_path)
+        zobrist, moves = paths[node_key]
+
+        if node.board == goal:
+            if state.improve_incumbent(node.depth):
+                state.results.put((worker, moves, 0))
+                print('Worker {} found a solution in {} moves after {} searched nodes'.format(
+                    worker, node.depth - 1, len(search_path)))
+            incumbent = state.incumbent.value
+            continue
+        if time.time() >= allowed_execution_time:
+            state.stop.set()
+            return
+        if len(search_path) % HDA_STAR_BATCH_SIZE == 0:
+            if sum(state.searched) >= max_l:
+                state.stop.set()
+                return
+            # Children are not held back while this worker searches costlier nodes
+            for owner, outbox in enumerate(outboxes):
+                if len(outbox) > 0:
+                    state.send(worker, outbox)
+                    outboxes[owner] = []
+            incumbent = state.incumbent.value
+        child_depth = node.depth + 1
+        for index, child_board, child_black_tokens, child_press, child_hn in \
+                zip(*expand_children(node, n, heuristic)):
+            if child_hn == DOUBLE_PRESS or child_depth + child_hn >= incumbent:
+                continue
+            child = (child_board, zobrist ^ press_keys[index], moves + array(MOVES_TYPECODE, (index,)), child_hn,
+                     child_black_tokens, node.pressed_cells | child_press)
+            owner = get_owner(child[1], state.workers)
+            if owner == worker:
+                add_child(open_list, closed_dict, paths, incumbent, *child)
+                continue
+            outboxes[owner].append(child)
+            if len(outboxes[owner]) >= HDA_STAR_BATCH_SIZE:
+                state.send(worker, outboxes[owner])
+                outboxes[owner] = []
+
+
+def receive_children(inbox: multiprocessing.Queue, block: bool) -> Union[List[Child], None]:
+    """
+    Take a message from the inbox of a worker
+    :param inbox: inbox of the worker
+    :param block: if True, wait up to HDA_STAR_IDLE_SECONDS for a message
+    :return: children owned by the worker, None if no message arrived
+    """
+    try:
+        return inbox.get(block, HDA_STAR_IDLE_SECONDS)
+    except queue.Empty:
+        return None
+
+
+def add_child(open_list: OpenList,
+              closed_dict: Dict[int, int],
+              paths: Dict[int, Tuple[int, array]],
+              incumbent: int,
+              board: int,
+              zobrist: int,
+              moves: array,
+              hn: float,
+              black_tokens: int,
+              pressed_cells: int):
+    """
+    Add a child to the open list of its owner, unless its board was reached with a lower or equal g(n)
+    or it cannot lead to a better solution
+    :param open_list: Priority Queue containing the discovered nodes of the worker, by f(n)
+    :param closed_dict: visited bitboards and the g(n) they were searched with
+    :param paths: hash and presses of the best known path to each board
+    :param incumbent: depth of the best solution
+    :return: void
+    """
+    depth = len(moves) + 1
+    if depth + hn >= incumbent or closed_dict.get(board, depth + 1) <= depth or open_list.is_open_with(board, depth):
+        return
+    open_list.push(board, Node(board, depth, None, moves[-1] if len(moves) > 0 else NO_MOVE, hn, black_tokens,
+                               pressed_cells), depth + hn, get_white_token_score(board))
+    paths[board] = zobrist, moves
+
+
+@lru_cache(maxsize=None)
+def get_hash_keys(n: int) -> Tuple[List[int], List[int]]:
+    """
+    Precompute the Zobrist keys of a grid of size n: a random key per cell, and the key of each press,
+    the xor of the keys of the cells it flips. Seeded by n, every worker computes the same keys
+    :param n: grid size
+    :return: keys of the cells and keys of the presses, indexed by row * n + col
+    """
+    rng = random.Random(n)
+    cell_keys = [rng.getrandbits(64) for _ in range(n * n)]
+    press_keys = []
+    for mask in get_flip_masks(n):
+        key = 0
+        for index in range(n * n):
+            if mask & get_cell_bit(n, *divmod(index, n)):
+                key ^= cell_keys[index]
+        press_keys.append(key)
+    return cell_keys, press_keys
+
+
+def get_board_hash(board: int, n: int) -> int:
+    """
+    Get the Zobrist hash of a board, the xor of the keys of its black cells.
+    A child's hash is its parent's xor the key of its press
+    :param board: bitboard representation of the grid
+    :param n: grid size
+    :return: hash of the board
+    """
+    zobrist = 0
+    for index, key in enumerate(get_hash_keys(n)[0]):
+        if board & get_cell_bit(n, *divmod(index, n)):
+            zobrist ^= key
+    return zobrist
+
+
+def get_owner(zobrist: int, workers: int) -> int:
+    """
+    Get the worker owning a board
+    :param zobrist: hash of the board
+    :param workers: number of workers
+    :return: index of the worker
+    """
+    return zobrist % workers
+
+
+def get_moves_node(board: int, n: int, moves: array) -> Node:
+    """
+    Replay presses from a board
+    :param board: bitboard representation of the input grid
+    :param n: grid size
+    :param moves: pressed cells in order
+    :return: last node, its parents leading back to the board
+    """
+    node = Node(board, 1)
+    for index in moves:
+        node = Node(flip_token(node.board, n, *divmod(index, n)), node.depth + 1, node, index)
+    return node
+
+
+if __name__ == '__main__':
+    main('input.txt')
@@ -6,7 +6,7 @@
 # Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
 # All rights reserved.
 # -----------------------------------------------------------
-from typing import Set
+from typing import List
 
 import constant
 from constant import DOUBLE_PRESS
@@ -15,15 +15,15 @@ from constant import DOUBLE_PRESS
 def get_heuristic(heuristic_algorithm: str,
                   parent_black_tokens: int,
                   black_token_diff: int,
-                  move_history: Set[str],
-                  new_move) -> float:
+                  pressed_cells: int,
+                  new_press: int) -> float:
     """
     Get h(n) for a given Node, given the heuristic algorithm
     :param parent_black_tokens: Number of black token of the parent node
     :param black_token_diff: Difference on black tokens after move
     :param heuristic_algorithm: Algorithm used to calculate heuristic
-    :param move_history: List of moves done from the root node
-    :param new_move: New move done for this child
+    :param pressed_cells: Bitmask of the cells pressed from the root node
+    :param new_press: Bit of the cell pressed for this child
     :return: h(n)
     """
     if heuristic_algorithm == constant.ZERO_HEURISTIC:
@@ -33,11 +33,36 @@ def get_heuristic(heuristic_algorithm: str,
     elif heuristic_algorithm == constant.DIV_BY_5_HEURISTIC:
         return get_div_by_5_heuristic(parent_black_tokens, black_token_diff)
     elif heuristic_algorithm == constant.NO_DOUBLE_PRESS_HEURISTIC:
-        return get_no_double_press_heuristic(parent_black_tokens, black_token_diff, move_history, new_move)
+        return get_no_double_press_heuristic(parent_black_tokens, black_token_diff, pressed_cells, new_press)
 
     return 0
 
 
+def get_children_heuristics(heuristic_algorithm: str,
+                            children_black_tokens: List[int],
+                            pressed_cells: int,
+                            new_presses: List[int]) -> List[float]:
+    """
+    Get h(n) of all the children of a node at once, dispatching on the heuristic algorithm a single time
+    :param heuristic_algorithm: Algorithm used to calculate heuristic
+    :param children_black_tokens: Number of black tokens of each child
+    :param pressed_cells: Bitmask of the cells pressed from the root node to the parent node
+    :param new_presses: Bit of the cell pressed for each child
+    :return: h(n) of each child
+    """
+    if heuristic_algorithm == constant.ZERO_HEURISTIC:
+        return [0.0] * len(children_black_tokens)
+    elif heuristic_algorithm == constant.COUNT_HEURISTIC:
+        return children_black_tokens
+    elif heuristic_algorithm == constant.DIV_BY_5_HEURISTIC:
+        return [black_tokens / 5 for black_tokens in children_black_tokens]
+    elif heuristic_algorithm == constant.NO_DOUBLE_PRESS_HEURISTIC:
+        return [DOUBLE_PRESS if pressed_cells & new_press else black_tokens / 5
+                for black_tokens, new_press in zip(children_black_tokens, new_presses)]
+
+    return [0] * len(children_black_tokens)
+
+
 def get_total_count_heuristic(parent_black_tokens: int, black_token_diff: int) -> float:
     """
     Counts the total number of black pegs on the board using differential calculation
@@ -60,9 +85,9 @@ def get_div_by_5_heuristic(parent_black_tokens: int, black_token_diff: int) -> f
 
 def get_no_double_press_heuristic(parent_black_tokens: int,
                                   black_token_diff: int,
-                                  move_history: Set[str],
-                                  new_move: str) -> float:
-    if new_move not in move_history:
+                                  pressed_cells: int,
+                                  new_press: int) -> float:
+    if not pressed_cells & new_press:
         return get_div_by_5_heuristic(parent_black_tokens, black_token_diff)
 
     return DOUBLE_PRESS
@@ -0,0 +1,146 @@
+# -----------------------------------------------------------
+# ida_star.py 22/01/20
+#
+# Define and run iterative-deepening a* search algorithm
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import sys
+import time
+from typing import List
+
+import constant
+from batch import get_jobs_argument, get_search_options, run_puzzles
+from constant import NO_SOLUTION, ZERO_HEURISTIC, COUNT_HEURISTIC, DIV_BY_5_HEURISTIC, \
+    NO_DOUBLE_PRESS_HEURISTIC, NO_MOVE, Node, IDA_STAR_ALGORITHM, TIME_TO_SOLVE_PUZZLE_SECONDS, \
+    TEXT_TRACE_FORMAT, TRANSPOSITION_TABLE_SIZE, SearchTimeout
+from heuristic import get_heuristic
+from linear_algebra import is_solvable
+from puzzle_loader import read_puzzles
+from search_trace import SearchTrace
+from transposition import TranspositionTable
+from utils import get_solution_path, board_to_grid_string, count_black_tokens, write_results, \
+    evaluate_ida_star_children, get_closed_set_memory, prepare_performance_file
+
+
+def main(file_path):
+    """
+    Read file, retrieve puzzle info, and execute ida* for each puzzle
+    :param (string) file_path: relative path the input file
+    :return: void
+    """
+    heuristics = [ZERO_HEURISTIC, COUNT_HEURISTIC, DIV_BY_5_HEURISTIC, NO_DOUBLE_PRESS_HEURISTIC]
+    if len(sys.argv) < 2 or sys.argv[1] not in heuristics:
+        print('Invalid heuristic. Accepted heuristics are: {}'.format(heuristics))
+        sys.exit()
+
+    heuristic = sys.argv[1]
+    jobs = get_jobs_argument(sys.argv)
+    options = get_search_options(sys.argv)
+    prepare_performance_file(IDA_STAR_ALGORITHM, heuristic)
+    puzzles = []
+    for puzzle_number, n, max_d, max_l, board, goal in read_puzzles(file_path):
+        puzzles.append({'board': board, 'n': n, 'goal': goal, 'max_l': max_l,
+                        'puzzle_number': puzzle_number, 'heuristic_algorithm': heuristic})
+    run_puzzles(execute_ida_star, puzzles, IDA_STAR_ALGORITHM, heuristic, jobs, options)
+
+
+def execute_ida_star(board: int,
+                     n: int,
+                     goal: int,
+                     max_l: int,
+                     puzzle_number: int,
+                     heuristic_algorithm: str,
+                     time_limit: float = TIME_TO_SOLVE_PUZZLE_SECONDS,
+                     trace_every: int = 1,
+                     trace_format: str = TEXT_TRACE_FORMAT,
+                     tt_size: int = TRANSPOSITION_TABLE_SIZE) -> tuple:
+    """
+    Wrapper function to run IDA*
+    :param board: bitboard representation of the input board.
+    :param n: grid size
+    :param goal: goal bitboard
+    :param max_l: maximum search path length
+    :param puzzle_number: line number of the puzzle
+    :param heuristic_algorithm: Heuristic algorithm to be used for this run
+    :param time_limit: seconds allowed for the search
+    :param trace_every: write one every trace_every searched nodes to the search file, 0 disables it
+    :param trace_format: write the text search file, the binary one or both
+    :param tt_size: maximum number of entries of the transposition table, 0 disables it
+    :return: performance data of the run, see gather_performance
+    """
+    print("Executing IDA* Algorithm with heuristic {} and max search length of {} on the grid\n{}".format(
+        heuristic_algorithm, max_l, board_to_grid_string(board, n)))
+    transposition_table = TranspositionTable(tt_size)
+    search_path = SearchTrace(puzzle_number, IDA_STAR_ALGORITHM, heuristic_algorithm, n, trace_every, trace_format)
+
+    # initialize root node information
+    num_black_tokens = count_black_tokens(board)
+    hn = get_heuristic(heuristic_algorithm, num_black_tokens, 0, 0, 0)
+    root_node = Node(board, 1, None, NO_MOVE, hn, num_black_tokens)
+
+    start_time = time.time()
+    try:
+        if is_solvable(board, n):
+            solution_path = ida_star(root_node, transposition_table, search_path, goal, max_l, heuristic_algorithm, n,
+                                     start_time + time_limit)
+        else:
+            solution_path = NO_SOLUTION
+    except SearchTimeout:
+        solution_path = NO_SOLUTION
+    finally:
+        search_path.close()
+    end_time = time.time()
+    write_results(puzzle_number, IDA_STAR_ALGORITHM, heuristic_algorithm, solution_path)
+    print('Found no solution' if solution_path == constant.NO_SOLUTION
+          else 'Found solution in {} moves'.format(len(solution_path) - 1))
+    return puzzle_number, n, solution_path, len(search_path), start_time, end_time, \
+        get_closed_set_memory(transposition_table.entries)
+
+
+def ida_star(root_node: Node,
+             transposition_table: TranspositionTable,
+             search_path: SearchTrace,
+             goal,
+             max_l,
+             heuristic,
+             n,
+             allowed_execution_time) -> List[str]:
+    """
+    Runs the IDA* search algorithm. Each iteration is a depth-first search bounded by an f(n) threshold,
+    raised to the smallest f(n) that exceeded it until a solution is found
+    :param root_node: root node
+    :param transposition_table: boards reached during the current iteration
+    :param search_path: Search trace of the searched nodes
+    :param goal: Goal bitboard
+    :param max_l: maximum search path length
+    :param heuristic: Heuristic algorithm to be used for this run
+    :param n: grid size
+    :param allowed_execution_time: maximum time to solve a puzzle
+    :return: Solution path if available, else returns a string indicating failure to find a solution
+    """
+    threshold = root_node.get_fn()
+    while threshold != float('inf'):
+        transposition_table.clear()
+        transposition_table.is_pruned(root_node.board, root_node.depth)
+        open_list = [root_node]
+        next_threshold = float('inf')
+        while len(open_list) > 0:
+            node = open_list.pop()
+            search_path.append(node)
+
+            if node.board == goal:
+                print('Search path length: {}'.format(len(search_path)))
+                return get_solution_path(node, n)
+            if len(search_path) >= max_l or time.time() >= allowed_execution_time:
+                return NO_SOLUTION
+            next_threshold = min(next_threshold,
+                                 evaluate_ida_star_children(open_list, transposition_table, node, heuristic, n,
+                                                            threshold))
+        threshold = next_threshold
+    return NO_SOLUTION
+
+
+if __name__ == '__main__':
+    main('input.txt')
@@ -0,0 +1,112 @@
+# -----------------------------------------------------------
+# iddfs.py 22/01/20
+#
+# Define and run iterative-deepening depth-first search algorithm
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import sys
+import time
+
+import constant
+from batch import get_jobs_argument, get_search_options, run_puzzles
+from linear_algebra import is_solvable
+from puzzle_loader import read_puzzles
+from search_trace import SearchTrace
+from transposition import TranspositionTable
+from utils import *
+
+
+def main(file_path):
+    """
+    Read file, retrieve puzzle info, and execute iddfs for each puzzle
+    :param (string) file_path: relative path to the input file
+    :return: void
+    """
+    jobs = get_jobs_argument(sys.argv)
+    options = get_search_options(sys.argv)
+    prepare_performance_file(IDDFS_ALGORITHM, NO_HEURISTIC)
+    puzzles = []
+    for puzzle_number, n, max_d, max_l, board, goal in read_puzzles(file_path):
+        puzzles.append({'board': board, 'n': n, 'max_d': max_d, 'goal': goal, 'puzzle_number': puzzle_number})
+    run_puzzles(execute_iddfs, puzzles, IDDFS_ALGORITHM, NO_HEURISTIC, jobs, options)
+
+
+def execute_iddfs(board, n, max_d, goal, puzzle_number, time_limit=TIME_TO_SOLVE_PUZZLE_SECONDS, trace_every=1,
+                  trace_format=TEXT_TRACE_FORMAT, tt_size=TRANSPOSITION_TABLE_SIZE):
+    """
+    Wrapper for IDDFS
+    :param (int) board: bitboard representation of the input board
+    :param (int) n: grid size
+    :param (int) max_d: maximum depth
+    :param (int) goal: goal bitboard
+    :param (int) puzzle_number: line number of the puzzle for which IDDFS is executed
+    :param (float) time_limit: seconds allowed for the search
+    :param (int) trace_every: write one every trace_every searched nodes to the search file, 0 disables it
+    :param (string) trace_format: write the text search file, the binary one or both
+    :param (int) tt_size: maximum number of entries of the transposition table, 0 disables it
+    :return (tuple): performance data of the run, see gather_performance
+    """
+    print('Execute IDDFS with max depth {} on grid \n{} '.format(max_d, board_to_grid_string(board, n)))
+    transposition_table = TranspositionTable(tt_size)
+    search_path = SearchTrace(puzzle_number, IDDFS_ALGORITHM, NO_HEURISTIC, n, trace_every, trace_format)
+
+    root = Node(board, 1)
+    start_time = time.time()
+    try:
+        if is_solvable(board, n):
+            solution_path = iddfs(root, transposition_table, search_path, goal, max_d, n, start_time + time_limit)
+        else:
+            solution_path = constant.NO_SOLUTION
+    except SearchTimeout:
+        solution_path = constant.NO_SOLUTION
+    finally:
+        search_path.close()
+    end_time = time.time()
+    write_results(puzzle_number, IDDFS_ALGORITHM, NO_HEURISTIC, solution_path)
+    print('Found no solution' if solution_path == constant.NO_SOLUTION
+          else 'Found result in {} moves'.format(len(solution_path) - 1))
+    return puzzle_number, n, solution_path, len(search_path), start_time, end_time, \
+        get_closed_set_memory(transposition_table.entries)
+
+
+def iddfs(root: Node, transposition_table, search_path, goal, max_d, n, allowed_execution_time):
+    """
+    Iterative-deepening DFS. Runs a depth-limited DFS with a limit growing from 1 to max_d,
+    only the stack of the current path's siblings is kept in memory
+    :param (Node) root: root node
+    :param (TranspositionTable) transposition_table: boards reached during the current iteration
+    :param (SearchTrace) search_path: search trace of the searched nodes
+    :param (int) goal: goal bitboard
+    :param (int) max_d: maximum execution depth
+    :param (int) n: grid size
+    :param allowed_execution_time: maximum time to solve a puzzle
+    :return (list | string): path up to identified solution. List of paths or 'no solution'
+    """
+    for depth_limit in range(1, max_d + 1):
+        transposition_table.clear()
+        transposition_table.is_pruned(root.board, root.depth)
+        open_list = [root]
+        cut_off = False
+        while len(open_list) > 0:
+            node = open_list.pop()
+
+            search_path.append(node)
+            if node.board == goal:
+                return get_solution_path(node, n)
+            if node.depth < depth_limit:
+                evaluate_iddfs_children(open_list, transposition_table, node, n)
+            else:
+                cut_off = True
+            if time.time() >= allowed_execution_time:
+                return constant.NO_SOLUTION
+        if not cut_off:
+            # The whole space was searched without reaching the depth limit
+            return constant.NO_SOLUTION
+    return constant.NO_SOLUTION
+
+
+if __name__ == '__main__':
+    # Define input file here
+    main('input.txt')
@@ -1,19 +1,113 @@
-from random import randrange
+# -----------------------------------------------------------
+# input_generator.py 22/01/20
+#
+# Define the seeded generator of puzzle corpora in the input file format
+#
+# Usage: python3 input_generator.py [--seed S] [--sizes 3-5] [--depths 2-8] [--count N] [--max-l L] [--random]
+#                                   [--output FILE]
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import sys
+from random import Random
+from typing import List, Tuple
 
-import numpy
+from batch import get_int_argument
+from utils import get_flip_masks, board_to_string
 
-from utils import flip_token, grid_to_string
+SEED_ARGUMENT = '--seed'
+SIZES_ARGUMENT = '--sizes'
+DEPTHS_ARGUMENT = '--depths'
+COUNT_ARGUMENT = '--count'
+MAX_L_ARGUMENT = '--max-l'
+RANDOM_ARGUMENT = '--random'
+OUTPUT_ARGUMENT = '--output'
 
-n = 10
-moves = 8
-grid = numpy.zeros(shape=(n, n), dtype=int)
-for row, col in numpy.ndindex(grid.shape):
-    grid[row, col] = 0
 
-for i in range(moves):
-    row = randrange(n)
-    col = randrange(n)
-    flip_token(grid, row, col)
+def get_range_argument(argv: List[str], name: str, default: Tuple[int, int]) -> Tuple[int, int]:
+    """
+    Read an inclusive range following an option on the command line
+    Example: (['input_generator.py', '--sizes', '3-5'], '--sizes', (10, 10)) => (3, 5)
+    :param argv: command line arguments
+    :param name: name of the option
+    :param default: range used if the option is not given
+    :return: lowest and highest value
+    """
+    if name not in argv:
+        return default
+    index = argv.index(name)
+    low, _, high = argv[index + 1].partition('-') if index + 1 < len(argv) else ('', '', '')
+    high = high or low
+    if not low.isdigit() or not high.isdigit() or int(low) > int(high) or int(low) < 1:
+        raise SystemExit('{} expects a positive value or range, e.g. 3-5'.format(name))
+    return int(low), int(high)
 
-print(grid)
-print('{} {} 5000 {}'.format(n, moves + 1, grid_to_string(grid).replace(' ', '')))
+
+def scramble_board(rng: Random, n: int, depth: int) -> int:
+    """
+    Press distinct random cells of the goal grid, the board is solvable in at most depth moves
+    :param rng: seeded random generator
+    :param n: grid size
+    :param depth: number of cells pressed, at most n * n
+    :return: bitboard representation of the grid
+    """
+    flip_masks = get_flip_masks(n)
+    board = 0
+    for index in rng.sample(range(n * n), min(depth, n * n)):
+        board ^= flip_masks[index]
+    return board
+
+
+def generate_corpus(seed: int, sizes: Tuple[int, int], depths: Tuple[int, int], count: int, max_l: int,
+                    solvable: bool = True) -> List[str]:
+    """
+    Generate puzzles in the input file format. The same arguments always give the same corpus
+    :param seed: seed of the random generator
+    :param sizes: lowest and highest grid size
+    :param depths: lowest and highest number of scrambling presses, ignored for random boards
+    :param count: number of puzzles
+    :param max_l: maximum search path length of each puzzle
+    :param solvable: if True, boards are scrambled from the goal, else their cells are drawn at random
+    :return: puzzle lines, without line breaks
+    """
+    rng = Random(seed)
+    puzzles = []
+    for _ in range(count):
+        n = rng.randint(*sizes)
+        if solvable:
+            depth = min(rng.randint(*depths), n * n)
+            board = scramble_board(rng, n, depth)
+        else:
+            depth = n * n
+            board = rng.getrandbits(n * n)
+        # The root node has depth 1, so depth presses need a max_d of depth + 1
+        puzzles.append('{} {} {} {}'.format(n, depth + 1, max_l, board_to_string(board, n, '')))
+    return puzzles
+
+
+def main(argv: List[str]):
+    """
+    Write a corpus to the output file, or print it
+    :param argv: command line arguments
+    :return: void
+    """
+    puzzles = generate_corpus(get_int_argument(argv, SEED_ARGUMENT, 0, 0),
+                              get_range_argument(argv, SIZES_ARGUMENT, (10, 10)),
+                              get_range_argument(argv, DEPTHS_ARGUMENT, (8, 8)),
+                              get_int_argument(argv, COUNT_ARGUMENT, 1, 1),
+                              get_int_argument(argv, MAX_L_ARGUMENT, 5000, 1),
+                              RANDOM_ARGUMENT not in argv)
+    if OUTPUT_ARGUMENT not in argv:
+        print('\n'.join(puzzles))
+        return
+    index = argv.index(OUTPUT_ARGUMENT)
+    if index + 1 >= len(argv):
+        raise SystemExit('{} expects a file name'.format(OUTPUT_ARGUMENT))
+    with open(argv[index + 1], 'w') as fp:
+        fp.write(''.join('{}\n'.format(puzzle) for puzzle in puzzles))
+    print('Wrote {} puzzles to {}'.format(len(puzzles), argv[index + 1]))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,86 @@
+# -----------------------------------------------------------
+# linear_algebra.py 22/01/20
+#
+# Define GF(2) linear algebra over the flip masks available throughout a project
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+from functools import lru_cache
+from typing import Dict, List, Tuple, Union
+
+from utils import get_flip_masks
+
+
+@lru_cache(maxsize=None)
+def get_flip_basis(n: int) -> Tuple[Dict[int, Tuple[int, int]], Tuple[int, ...]]:
+    """
+    Run Gaussian elimination over GF(2) on the flip masks of a grid of size n.
+    Each basis vector is stored with the combination of presses producing it, bit i meaning cell i is pressed
+    :param n: grid size
+    :return: basis keyed by pivot bit as (vector, combination), and the null space combinations
+    """
+    basis = {}
+    null_space = []
+    for index, mask in enumerate(get_flip_masks(n)):
+        vector, combination = reduce_vector(basis, mask, 1 << index)
+        if vector:
+            basis[vector.bit_length() - 1] = (vector, combination)
+        else:
+            null_space.append(combination)
+    return basis, tuple(null_space)
+
+
+def reduce_vector(basis: Dict[int, Tuple[int, int]], vector: int, combination: int) -> Tuple[int, int]:
+    """
+    Reduce a vector against the basis, keeping track of the presses used
+    :param basis: basis keyed by pivot bit as (vector, combination)
+    :param vector: bitboard to reduce
+    :param combination: presses already applied to the vector
+    :return: remainder of the reduction and the presses used
+    """
+    while vector:
+        pivot = vector.bit_length() - 1
+        if pivot not in basis:
+            break
+        basis_vector, basis_combination = basis[pivot]
+        vector ^= basis_vector
+        combination ^= basis_combination
+    return vector, combination
+
+
+def is_solvable(board: int, n: int) -> bool:
+    """
+    Check if a board is in the span of the flip masks, meaning it can be solved
+    :param board: bitboard representation of the grid
+    :param n: grid size
+    :return: True if a solution exists
+    """
+    basis, _ = get_flip_basis(n)
+    remainder, _ = reduce_vector(basis, board, 0)
+    return remainder == 0
+
+
+def get_minimal_presses(board: int, n: int) -> Union[List[int], None]:
+    """
+    Get the smallest set of cells to press to solve a board, by enumerating the null space
+    in Gray code order around a particular solution
+    :param board: bitboard representation of the grid
+    :param n: grid size
+    :return: sorted cell indexes (row * n + col) to press, or None if the board is not solvable
+    """
+    basis, null_space = get_flip_basis(n)
+    remainder, combination = reduce_vector(basis, board, 0)
+    if remainder:
+        return None
+
+    best = combination
+    best_count = bin(combination).count('1')
+    for i in range(1, 1 << len(null_space)):
+        # Gray code: exactly one null space vector changes between consecutive candidates
+        combination ^= null_space[(i & -i).bit_length() - 1]
+        count = bin(combination).count('1')
+        if count < best_count:
+            best = combination
+            best_count = count
+    return [index for index in range(n * n) if best >> index & 1]
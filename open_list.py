@@ -0,0 +1,177 @@
+# -----------------------------------------------------------
+# open_list.py 22/01/20
+#
+# Define the priority queue of the discovered nodes of the informed searches
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+from heapq import heappush, heappop, heapify
+from typing import Callable, Dict, Hashable, List, Tuple, Union
+
+from constant import Node
+
+# Heuristic values are integers or multiples of 1/5 (div-5-h), so f(n) * 5 is an integer
+PRIORITY_SCALE = 5
+
+
+class OpenList:
+    """
+    Binary heap of the discovered nodes with lazy deletion. A board reached again with a lower g(n)
+    is pushed again (decrease-key), and the former entry is skipped when it is popped.
+    Entries are ordered by priority, then tie-break score, then push order, so nodes are never compared
+    """
+    heap: List[Tuple[float, int, int, Hashable, Node]]
+    best_gn: Dict[Hashable, int]
+    pushes: int
+
+    def __init__(self):
+        """
+        Generate OpenList object
+        """
+        self.heap = []
+        self.best_gn = {}
+        self.pushes = 0
+
+    def push(self, key: Hashable, node: Node, priority: float, score: int) -> bool:
+        """
+        Add a node, unless its board is already open with a lower or equal g(n)
+        :param key: board key, see get_state_key
+        :param node: Node object
+        :param priority: f(n) for A*, h(n) for BFS, smallest first
+        :param score: tie-break between equal priorities, smallest first, see get_white_token_score
+        :return: True if the node was added
+        """
+        if self.is_open_with(key, node.depth):
+            return False
+        self.best_gn[key] = node.depth
+        heappush(self.heap, (priority, score, self.pushes, key, node))
+        self.pushes += 1
+        return True
+
+    def is_open_with(self, key: Hashable, gn: int) -> bool:
+        """
+        Check if a board is open with a lower or equal g(n), a node reaching it with gn would not be added
+        :param key: board key, see get_state_key
+        :param gn: g(n) the board is reached with
+        :return: True if the board is open with a lower or equal g(n)
+        """
+        best_gn = self.best_gn.get(key)
+        return best_gn is not None and best_gn <= gn
+
+    def pop(self) -> Tuple[Hashable, Node]:
+        """
+        Remove the open node with the smallest priority, skipping the entries replaced by a lower g(n)
+        :return: board key and node
+        """
+        while True:
+            _, _, _, key, node = heappop(self.heap)
+            if self.best_gn.get(key) == node.depth:
+                del self.best_gn[key]
+                return key, node
+
+    def reprioritize(self, get_priority: Callable[[Node], float]):
+        """
+        Compute the priority of every open node again, dropping the replaced entries
+        :param get_priority: priority of a node, smallest first
+        :return: void
+        """
+        self.heap = [(get_priority(node), score, pushes, key, node) for _, score, pushes, key, node in self.heap
+                     if self.best_gn.get(key) == node.depth]
+        heapify(self.heap)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """
+        :param key: board key, see get_state_key
+        :return: True if the board is open
+        """
+        return key in self.best_gn
+
+    def __len__(self) -> int:
+        """
+        :return: number of open boards
+        """
+        return len(self.best_gn)
+
+
+class BucketOpenList:
+    """
+    Open list with one bucket per priority, f(n) and h(n) only taking a few hundred values.
+    Each bucket is a binary heap by tie-break score then push order, so nodes are popped in the same order
+    as OpenList, and the heaps stay small when many nodes share a priority. Boards reached again are handled
+    the same way
+    """
+    buckets: Dict[int, List[Tuple[int, int, Hashable, Node]]]
+    active: Union[int, None]
+    best_gn: Dict[Hashable, int]
+    pushes: int
+
+    def __init__(self):
+        """
+        Generate BucketOpenList object
+        """
+        self.buckets = {}
+        self.active = None
+        self.best_gn = {}
+        self.pushes = 0
+
+    def push(self, key: Hashable, node: Node, priority: float, score: int) -> bool:
+        """
+        Add a node, unless its board is already open with a lower or equal g(n)
+        :param key: board key, see get_state_key
+        :param node: Node object
+        :param priority: f(n) for A*, h(n) for BFS, smallest first. Must be a multiple of 1 / PRIORITY_SCALE
+        :param score: tie-break between equal priorities, smallest first, see get_white_token_score
+        :return: True if the node was added
+        """
+        if self.is_open_with(key, node.depth):
+            return False
+        bucket_key = round(priority * PRIORITY_SCALE)
+        if abs(bucket_key - priority * PRIORITY_SCALE) > 1e-6:
+            raise ValueError('Priority {} is not a multiple of 1/{}'.format(priority, PRIORITY_SCALE))
+        self.best_gn[key] = node.depth
+        heappush(self.buckets.setdefault(bucket_key, []), (score, self.pushes, key, node))
+        if self.active is not None and bucket_key < self.active:
+            self.active = bucket_key
+        self.pushes += 1
+        return True
+
+    def is_open_with(self, key: Hashable, gn: int) -> bool:
+        """
+        Check if a board is open with a lower or equal g(n), a node reaching it with gn would not be added
+        :param key: board key, see get_state_key
+        :param gn: g(n) the board is reached with
+        :return: True if the board is open with a lower or equal g(n)
+        """
+        best_gn = self.best_gn.get(key)
+        return best_gn is not None and best_gn <= gn
+
+    def pop(self) -> Tuple[Hashable, Node]:
+        """
+        Remove the open node with the smallest priority, skipping the entries replaced by a lower g(n)
+        :return: board key and node
+        """
+        while True:
+            if self.active is None:
+                self.active = min(self.buckets)
+            bucket = self.buckets[self.active]
+            _, _, key, node = heappop(bucket)
+            if len(bucket) == 0:
+                del self.buckets[self.active]
+                self.active = None
+            if self.best_gn.get(key) == node.depth:
+                del self.best_gn[key]
+                return key, node
+
+    def __contains__(self, key: Hashable) -> bool:
+        """
+        :param key: board key, see get_state_key
+        :return: True if the board is open
+        """
+        return key in self.best_gn
+
+    def __len__(self) -> int:
+        """
+        :return: number of open boards
+        """
+        return len(self.best_gn)
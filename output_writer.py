@@ -0,0 +1,164 @@
+# -----------------------------------------------------------
+# output_writer.py 22/01/20
+#
+# Define the background writer of the solution, search and performance files
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import atexit
+import os
+import queue
+import threading
+from typing import Dict, List, Set, Tuple, Union
+
+# Chunks waiting to be written, the solver blocks once the writer is this far behind
+OUTPUT_QUEUE_SIZE = 256
+# Chunks merged into a single open and write per file
+OUTPUT_BATCH_SIZE = 64
+
+
+class OutputWriter:
+    """
+    Thread writing the output files of the solvers. Solvers hand it whole chunks through a bounded queue,
+    chunks of a same file are merged and written with a single open, and directories are created once.
+    A write error is raised by the next call of the solver thread
+    """
+    queue: queue.Queue
+    directories: Set[str]
+    error: Union[OSError, None]
+
+    def __init__(self, queue_size: int = OUTPUT_QUEUE_SIZE):
+        """
+        Start the writer thread
+        :param queue_size: number of chunks waiting to be written
+        """
+        self.queue = queue.Queue(queue_size)
+        self.directories = set()
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name='output-writer', daemon=True)
+        self.thread.start()
+
+    def write(self, filename: str, data: Union[str, bytes], append: bool = False):
+        """
+        Queue a chunk, text or binary, to be written to a file
+        :param filename: relative path to the file
+        :param data: chunk to write
+        :param append: if True, the chunk is added at the end of the file, else it replaces the file
+        :return: void
+        """
+        self.raise_error()
+        self.queue.put((filename, data, append))
+
+    def flush(self):
+        """
+        Wait until every queued chunk is written
+        :return: void
+        """
+        self.queue.join()
+        self.raise_error()
+
+    def close(self):
+        """
+        Write the queued chunks and stop the thread
+        :return: void
+        """
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        self.raise_error()
+
+    def raise_error(self):
+        """
+        Raise the error of a previous write, once
+        :return: void
+        """
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def run(self):
+        """
+        Thread loop: take the queued chunks in batches, and write the chunks of each file at once
+        :return: void
+        """
+        stop = False
+        while not stop:
+            items = [self.queue.get()]
+            while len(items) < OUTPUT_BATCH_SIZE:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            files: Dict[str, Tuple[bool, List[Union[str, bytes]]]] = {}
+            for item in items:
+                if item is None:
+                    stop = True
+                    continue
+                filename, data, append = item
+                if append and filename in files:
+                    files[filename][1].append(data)
+                else:
+                    files[filename] = (append, [data])
+            try:
+                for filename, (append, chunks) in files.items():
+                    self.write_file(filename, chunks, append)
+            except OSError as error:
+                self.error = error
+            finally:
+                for _ in items:
+                    self.queue.task_done()
+
+    def write_file(self, filename: str, chunks: List[Union[str, bytes]], append: bool):
+        """
+        Write chunks to a file, creating its directory the first time
+        :param filename: relative path to the file
+        :param chunks: chunks of a same type, text or binary
+        :param append: if True, the chunks are added at the end of the file, else they replace the file
+        :return: void
+        """
+        directory = os.path.dirname(filename)
+        if directory not in self.directories:
+            os.makedirs(directory, exist_ok=True)
+            self.directories.add(directory)
+        binary = isinstance(chunks[0], bytes)
+        with open(filename, ('a' if append else 'w') + ('b' if binary else '')) as fp:
+            fp.write((b'' if binary else '').join(chunks))
+
+
+writers: Dict[int, OutputWriter] = {}
+
+
+def get_output_writer() -> OutputWriter:
+    """
+    Get the writer of the current process, started on first use. Threads do not survive a fork,
+    so a worker process starts its own writer
+    :return: writer of the current process
+    """
+    writer = writers.get(os.getpid())
+    if writer is None:
+        writer = writers[os.getpid()] = OutputWriter()
+        # Written on exit, including after an unhandled exception
+        atexit.register(writer.close)
+    return writer
+
+
+def flush_output():
+    """
+    Wait until the output of the current process is written
+    :return: void
+    """
+    writer = writers.get(os.getpid())
+    if writer is not None:
+        writer.flush()
+
+
+def close_output():
+    """
+    Write the output of the current process and stop its writer, before forking worker processes.
+    A writer is started again on the next write
+    :return: void
+    """
+    writer = writers.pop(os.getpid(), None)
+    if writer is not None:
+        writer.close()
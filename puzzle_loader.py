@@ -0,0 +1,89 @@
+# -----------------------------------------------------------
+# puzzle_loader.py 22/01/20
+#
+# Define the streaming reader of the puzzles of an input file
+#
+# Usage: python3 puzzle_loader.py FILE [--shard I --shards K], validate a file and print its puzzles of shard I of K
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import mmap
+import os
+import sys
+from typing import Iterable, Iterator, Tuple
+
+from batch import get_int_argument
+from constant import PuzzleFormatError
+from utils import get_puzzle_info, board_to_string
+
+STDIN_FILE = '-'
+SHARD_ARGUMENT = '--shard'
+SHARDS_ARGUMENT = '--shards'
+
+
+def get_file_lines(file_path: str) -> Iterable[bytes]:
+    """
+    Get the lines of an input file. A file is memory-mapped and closed right away, only the pages being read
+    are loaded, and '-' reads stdin as it is written
+    :param file_path: relative path to the input file, or '-'
+    :return: lines of the file, with their line breaks
+    """
+    if file_path == STDIN_FILE:
+        return sys.stdin.buffer
+    with open(file_path, 'rb') as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            return []
+        lines = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    return iter(lines.readline, b'')
+
+
+def read_puzzles(file_path: str, shard: int = 0, shards: int = 1) \
+        -> Iterator[Tuple[int, int, int, int, int, int]]:
+    """
+    Stream the puzzles of an input file. Blank lines are skipped and puzzles are numbered from 0 in file order.
+    With several shards, only the puzzles whose number is shard modulo shards are parsed and returned
+    :param file_path: relative path to the input file, or '-' for stdin
+    :param shard: index of the shard to read
+    :param shards: number of shards
+    :return: puzzle number, n, max_d, max_l, board and goal of each puzzle
+    """
+    puzzle_number = 0
+    for line_number, line in enumerate(get_file_lines(file_path), 1):
+        if line.isspace() or len(line) == 0:
+            continue
+        if puzzle_number % shards == shard:
+            try:
+                puzzle = line.decode('ascii')
+            except UnicodeDecodeError:
+                raise PuzzleFormatError('Line {}: not an ASCII line'.format(line_number))
+            yield (puzzle_number, *get_puzzle_info(puzzle, line_number))
+        puzzle_number += 1
+
+
+def main(argv):
+    """
+    Validate every puzzle of a file, and print the puzzles of a shard
+    :param argv: command line arguments
+    :return: void
+    """
+    if len(argv) < 2:
+        raise SystemExit('Usage: python3 puzzle_loader.py FILE [--shard I --shards K]')
+    shards = get_int_argument(argv, SHARDS_ARGUMENT, 1, 1)
+    shard = get_int_argument(argv, SHARD_ARGUMENT, 0, 0)
+    if shard >= shards:
+        raise SystemExit('{} must be lower than {}'.format(SHARD_ARGUMENT, SHARDS_ARGUMENT))
+    count = 0
+    try:
+        # Every puzzle is validated, the ones of other shards are not printed
+        for puzzle_number, n, max_d, max_l, board, goal in read_puzzles(argv[1]):
+            if puzzle_number % shards == shard:
+                print('{} {} {} {}'.format(n, max_d, max_l, board_to_string(board, n, '')))
+            count += 1
+    except PuzzleFormatError as error:
+        raise SystemExit('{}: {}'.format(argv[1], error))
+    print('{} valid puzzles'.format(count), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
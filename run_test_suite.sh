@@ -1,9 +1 @@
-python3 dfs.py
-python3 a_star.py zero-h
-python3 a_star.py count-h
-python3 a_star.py div-5-h
-python3 a_star.py no-dbl-press-h
-python3 bfs.py zero-h
-python3 bfs.py count-h
-python3 bfs.py div-5-h
-python3 bfs.py no-dbl-press-h
+python3 experiment.py "$@"
@@ -0,0 +1,150 @@
+# -----------------------------------------------------------
+# search_metrics.py 22/01/20
+#
+# Define the instrumentation of the search loops, written as JSON next to the performance files
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import json
+import sys
+import time
+from typing import Dict, List, Union
+
+from constant import METRICS_FILE_TEMPLATE
+from output_writer import get_output_writer
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, the peak resident memory is then not reported
+    resource = None
+
+FLIP_PHASE = 'flip'
+HEURISTIC_PHASE = 'heuristic'
+HEAP_PHASE = 'heap'
+SERIALIZATION_PHASE = 'serialization'
+PHASES = [FLIP_PHASE, HEURISTIC_PHASE, HEAP_PHASE, SERIALIZATION_PHASE]
+
+
+def get_peak_memory() -> Union[int, None]:
+    """
+    Get the peak resident memory of the process
+    :return: memory size in bytes, None if it cannot be read
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class SearchMetrics:
+    """
+    Counters of a search run. Expansions, generated and duplicate children are counted on every expansion,
+    the time split across phases and the sizes of the open and closed sets only on one every metrics_every
+    expansions, so the overhead stays small when sampling is sparse
+    """
+    expansions: int
+    generated: int
+    added: int
+    phase_seconds: Dict[str, float]
+    samples: List[Dict]
+
+    def __init__(self, puzzle_number: int, algorithm: str, heuristic: str, metrics_every: int = 0):
+        """
+        Generate SearchMetrics object
+        :param puzzle_number: line number of the puzzle prepended to the name of the file
+        :param algorithm: Algorithm used for the current run
+        :param heuristic: Heuristic used to solve puzzle
+        :param metrics_every: sample one every metrics_every expansions, 0 disables the metrics file
+        """
+        self.puzzle_number = puzzle_number
+        self.algorithm = algorithm
+        self.heuristic = heuristic
+        self.metrics_every = metrics_every
+        self.expansions = 0
+        self.generated = 0
+        self.added = 0
+        self.peak_open = 0
+        self.peak_closed = 0
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.samples = []
+        self.start_time = time.perf_counter()
+        self.lap_time = self.start_time
+
+    def start_expansion(self) -> Union['SearchMetrics', None]:
+        """
+        Count an expansion and start timing its phases if it is sampled
+        :return: self if the expansion is sampled, else None
+        """
+        self.expansions += 1
+        if self.metrics_every > 0 and self.expansions % self.metrics_every == 0:
+            self.lap_time = time.perf_counter()
+            return self
+        return None
+
+    def lap(self, phase: str):
+        """
+        Add the time elapsed since the previous lap of the sampled expansion to a phase
+        :param phase: one of PHASES
+        :return: void
+        """
+        now = time.perf_counter()
+        self.phase_seconds[phase] += now - self.lap_time
+        self.lap_time = now
+
+    def end_expansion(self, generated: int, added: int, open_size: int, closed_size: int):
+        """
+        Count the children of an expansion, and record a sample if it is sampled
+        :param generated: children built, not counting the ones pruned by the heuristic
+        :param added: children added to the open list, the others being duplicates of open or closed boards
+        :param open_size: number of open nodes
+        :param closed_size: number of closed boards
+        :return: void
+        """
+        self.generated += generated
+        self.added += added
+        if self.metrics_every > 0 and self.expansions % self.metrics_every == 0:
+            self.peak_open = max(self.peak_open, open_size)
+            self.peak_closed = max(self.peak_closed, closed_size)
+            elapsed = time.perf_counter() - self.start_time
+            self.samples.append({'expansions': self.expansions,
+                                 'elapsed_seconds': elapsed,
+                                 'expansions_per_second': self.expansions / elapsed if elapsed > 0 else 0.0,
+                                 'generated': self.generated,
+                                 'duplicates': self.generated - self.added,
+                                 'open_size': open_size,
+                                 'closed_size': closed_size})
+
+    def close(self, open_size: int, closed_size: int, closed_set_memory: int):
+        """
+        Write the metrics file of the run, if enabled
+        :param open_size: number of open nodes at the end of the search
+        :param closed_size: number of closed boards at the end of the search
+        :param closed_set_memory: bytes held by the closed set, see get_closed_set_memory
+        :return: void
+        """
+        if self.metrics_every == 0:
+            return
+        elapsed = time.perf_counter() - self.start_time
+        metrics = {'puzzle_number': self.puzzle_number,
+                   'algorithm': self.algorithm,
+                   'heuristic': self.heuristic,
+                   'metrics_every': self.metrics_every,
+                   'expansions': self.expansions,
+                   'elapsed_seconds': elapsed,
+                   'expansions_per_second': self.expansions / elapsed if elapsed > 0 else 0.0,
+                   'generated': self.generated,
+                   'duplicates': self.generated - self.added,
+                   'peak_open_size': max(self.peak_open, open_size),
+                   'peak_closed_size': max(self.peak_closed, closed_size),
+                   'closed_set_memory_bytes': closed_set_memory,
+                   'peak_memory_bytes': get_peak_memory(),
+                   'sampled_phase_seconds': self.phase_seconds,
+                   # Only sampled expansions are timed, scale them to the whole run
+                   'estimated_phase_seconds': {phase: seconds * self.metrics_every
+                                               for phase, seconds in self.phase_seconds.items()},
+                   'samples': self.samples}
+        filename = METRICS_FILE_TEMPLATE.format(self.heuristic, self.puzzle_number, self.algorithm)
+        get_output_writer().write(filename, json.dumps(metrics, indent=2))
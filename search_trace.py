@@ -0,0 +1,105 @@
+# -----------------------------------------------------------
+# search_trace.py 22/01/20
+#
+# Define the search trace streaming searched nodes to the search file
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import io
+
+from binary_trace import pack_search_record, write_binary_header
+from constant import Node, SEARCH_FILE_TEMPLATE, BINARY_SEARCH_FILE_TEMPLATE, TEXT_TRACE_FORMAT, \
+    BINARY_TRACE_FORMAT, BOTH_TRACE_FORMATS
+from output_writer import get_output_writer
+from utils import board_to_string, format_search_move, get_search_values
+
+TRACE_BUFFER_SIZE = 1 << 16
+
+
+class SearchTrace:
+    """
+    Search path of a run. Searched nodes are streamed to the search files as they are expanded instead of being
+    kept in memory, only their count is kept. They are buffered here and handed to the output writer
+    TRACE_BUFFER_SIZE characters or bytes at a time
+    """
+    length: int
+
+    def __init__(self,
+                 puzzle_number: int,
+                 algorithm: str,
+                 heuristic: str,
+                 n: int,
+                 trace_every: int = 1,
+                 trace_format: str = TEXT_TRACE_FORMAT):
+        """
+        Open the search files of the run
+        :param puzzle_number: line number of the puzzle prepended to the name of the file
+        :param algorithm: Algorithm used for the current run
+        :param heuristic: Heuristic used to solve puzzle
+        :param n: grid size
+        :param trace_every: write one every trace_every searched nodes, 0 disables the search files
+        :param trace_format: write the text search file, the binary one or both
+        """
+        self.length = 0
+        self.algorithm = algorithm
+        self.n = n
+        self.trace_every = trace_every
+        self.fp = None
+        self.binary_fp = None
+        self.filename = None
+        self.binary_filename = None
+        self.buffered = 0
+        self.appending = False
+        if trace_every > 0 and trace_format in [TEXT_TRACE_FORMAT, BOTH_TRACE_FORMATS]:
+            self.filename = SEARCH_FILE_TEMPLATE.format(heuristic, puzzle_number, algorithm)
+            self.fp = io.StringIO()
+        if trace_every > 0 and trace_format in [BINARY_TRACE_FORMAT, BOTH_TRACE_FORMATS]:
+            self.binary_filename = BINARY_SEARCH_FILE_TEMPLATE.format(heuristic, puzzle_number, algorithm)
+            self.binary_fp = io.BytesIO()
+            write_binary_header(self.binary_fp, n, algorithm, heuristic)
+
+    def append(self, node: Node):
+        """
+        Count a searched node and write it to the search files if it is sampled
+        :param node: Node object
+        :return: void
+        """
+        if (self.fp is not None or self.binary_fp is not None) and self.length % self.trace_every == 0:
+            fn, gn, hn = get_search_values(self.algorithm, node)
+            if self.fp is not None:
+                line = format_search_move(fn, gn, hn, board_to_string(node.board, self.n, ''))
+                self.buffered += self.fp.write('{}\n'.format(line))
+            if self.binary_fp is not None:
+                self.buffered += self.binary_fp.write(pack_search_record(hn, gn, node.board, self.n))
+            if self.buffered >= TRACE_BUFFER_SIZE:
+                self.flush()
+        self.length += 1
+
+    def flush(self):
+        """
+        Hand the buffered nodes to the output writer. The first chunk of a run replaces the previous search files
+        :return: void
+        """
+        writer = get_output_writer()
+        if self.fp is not None:
+            writer.write(self.filename, self.fp.getvalue(), self.appending)
+            self.fp = io.StringIO()
+        if self.binary_fp is not None:
+            writer.write(self.binary_filename, self.binary_fp.getvalue(), self.appending)
+            self.binary_fp = io.BytesIO()
+        self.buffered = 0
+        self.appending = True
+
+    def close(self):
+        """
+        Hand the remaining nodes to the output writer and stop buffering
+        :return: void
+        """
+        if self.fp is not None or self.binary_fp is not None:
+            self.flush()
+        self.fp = None
+        self.binary_fp = None
+
+    def __len__(self):
+        return self.length
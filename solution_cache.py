@@ -0,0 +1,147 @@
+# -----------------------------------------------------------
+# solution_cache.py 22/01/20
+#
+# Define the persistent cache of solved puzzles, shared by the runs of a same board
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Tuple, Union
+
+from constant import NO_SOLUTION
+from utils import write_results
+
+# Seconds a process waits for another one holding the write lock
+LOCK_TIMEOUT_SECONDS = 30
+
+
+class SolutionCache:
+    """
+    SQLite table of the results of a search, keyed by grid size, board, algorithm, heuristic, search bound
+    and the options changing the result. Once it holds more than max_entries results,
+    the least recently used ones are evicted
+    """
+
+    def __init__(self, file_path: str, max_entries: int):
+        """
+        Open the cache file, creating it if needed
+        :param file_path: relative path to the SQLite file
+        :param max_entries: number of results kept
+        """
+        if os.path.dirname(file_path):
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        self.max_entries = max_entries
+        self.connection = sqlite3.connect(file_path, timeout=LOCK_TIMEOUT_SECONDS)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS solutions ('
+                                'n INTEGER, board TEXT, algorithm TEXT, heuristic TEXT, bound INTEGER, options TEXT, '
+                                'solution TEXT, search_length INTEGER, seconds REAL, closed_set_memory INTEGER, '
+                                'last_used REAL, PRIMARY KEY (n, board, algorithm, heuristic, bound, options))')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used)')
+        self.connection.commit()
+
+    def get(self, key: Tuple) -> Union[Tuple[Union[list, str], int, float, int], None]:
+        """
+        Look up a result and mark it as recently used
+        :param key: see get_cache_key
+        :return: solution path, search length, seconds and closed set memory, None if not cached
+        """
+        row = self.connection.execute('SELECT solution, search_length, seconds, closed_set_memory FROM solutions '
+                                      'WHERE n = ? AND board = ? AND algorithm = ? AND heuristic = ? AND bound = ? '
+                                      'AND options = ?', key).fetchone()
+        if row is None:
+            return None
+        self.connection.execute('UPDATE solutions SET last_used = ? WHERE n = ? AND board = ? AND algorithm = ? '
+                                'AND heuristic = ? AND bound = ? AND options = ?', (time.time(),) + key)
+        self.connection.commit()
+        solution, search_length, seconds, closed_set_memory = row
+        return NO_SOLUTION if solution is None else json.loads(solution), search_length, seconds, closed_set_memory
+
+    def put(self, key: Tuple, solution_path: Union[list, str], search_length: int, seconds: float,
+            closed_set_memory: int):
+        """
+        Store a result, then evict the least recently used results over max_entries
+        :param key: see get_cache_key
+        :param solution_path: path up to identified solution. List of paths or 'no solution'
+        :param search_length: number of searched nodes
+        :param seconds: time taken by the search
+        :param closed_set_memory: bytes held by the closed set
+        :return: void
+        """
+        solution = None if solution_path == NO_SOLUTION else json.dumps(solution_path)
+        self.connection.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                key + (solution, search_length, seconds, closed_set_memory, time.time()))
+        excess = self.connection.execute('SELECT COUNT(*) FROM solutions').fetchone()[0] - self.max_entries
+        if excess > 0:
+            self.connection.execute('DELETE FROM solutions WHERE rowid IN '
+                                    '(SELECT rowid FROM solutions ORDER BY last_used LIMIT ?)', (excess,))
+        self.connection.commit()
+
+    def close(self):
+        """
+        Close the cache file
+        :return: void
+        """
+        self.connection.close()
+
+
+def get_cache_key(n: int, board: int, algorithm: str, heuristic: str, bound: int, options: Dict) -> Tuple:
+    """
+    Get the key of a result. Boards of more than 64 cells do not fit an SQLite integer and are stored in hexadecimal
+    :param n: grid size
+    :param board: bitboard representation of the input board
+    :param algorithm: Algorithm used for the run
+    :param heuristic: Heuristic used to solve puzzle
+    :param bound: max_d or max_l of the search
+    :param options: options of the run changing its result, e.g. symmetry
+    :return: key of the result
+    """
+    return n, format(board, 'x'), algorithm, heuristic, bound, json.dumps(options, sort_keys=True)
+
+
+def get_cached_performance(cache_file: str, max_entries: int, key: Tuple, puzzle_number: int, algorithm: str,
+                           heuristic: str) -> Union[tuple, None]:
+    """
+    Look up a run in the cache. On a hit, the solution file is written and the search file is left as it is
+    :param cache_file: relative path to the SQLite file
+    :param max_entries: number of results kept
+    :param key: see get_cache_key
+    :param puzzle_number: line number of the puzzle prepended to the name of the file
+    :param algorithm: Algorithm used for the current run
+    :param heuristic: Heuristic used to solve puzzle
+    :return: performance data of the cached search, see gather_performance, None if not cached
+    """
+    cache = SolutionCache(cache_file, max_entries)
+    try:
+        result = cache.get(key)
+    finally:
+        cache.close()
+    if result is None:
+        return None
+    solution_path, search_length, seconds, closed_set_memory = result
+    write_results(puzzle_number, algorithm, heuristic, solution_path)
+    print('Cache hit, found {}'.format('no solution' if solution_path == NO_SOLUTION
+                                       else 'solution in {} moves'.format(len(solution_path) - 1)))
+    # The performance line repeats the time of the cached search
+    start_time = time.time()
+    return puzzle_number, key[0], solution_path, search_length, start_time, start_time + seconds, closed_set_memory
+
+
+def store_performance(cache_file: str, max_entries: int, key: Tuple, performance: tuple):
+    """
+    Store the result of a run in the cache
+    :param cache_file: relative path to the SQLite file
+    :param max_entries: number of results kept
+    :param key: see get_cache_key
+    :param performance: performance data of the run, see gather_performance
+    :return: void
+    """
+    _, _, solution_path, search_length, start_time, end_time, closed_set_memory = performance
+    cache = SolutionCache(cache_file, max_entries)
+    try:
+        cache.put(key, solution_path, search_length, end_time - start_time, closed_set_memory)
+    finally:
+        cache.close()
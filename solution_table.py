@@ -0,0 +1,106 @@
+# -----------------------------------------------------------
+# solution_table.py 22/01/20
+#
+# Define the precomputed table of optimal moves of every board of a small grid, and its builder
+#
+# Usage: python3 solution_table.py N [N ...]
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import mmap
+import os
+import sys
+from functools import lru_cache
+from typing import List, Union
+
+from constant import SOLUTION_TABLE_TEMPLATE, SOLUTION_TABLE_MAX_SIZE
+from utils import get_flip_masks
+
+# Each board has an entry of 2 bytes at offset 2 * board: optimal distance and one optimal move
+ENTRY_SIZE = 2
+UNREACHABLE = 0xFF
+
+
+def build_solution_table(n: int) -> bytearray:
+    """
+    Build the table of every board of a grid of size n by enumerating every set of presses in Gray code order,
+    each step pressing or releasing a single cell. The smallest set reaching a board is optimal,
+    and pressing any of its cells leads to a board one move closer to the goal
+    :param n: grid size
+    :return: 2 ** (n * n) entries of distance and move, UNREACHABLE if the board is not solvable
+    """
+    flip_masks = get_flip_masks(n)
+    table = bytearray([UNREACHABLE]) * (ENTRY_SIZE << (n * n))
+    table[0] = 0
+    board = 0
+    presses = 0
+    pressed = 0
+    for i in range(1, 1 << (n * n)):
+        # Gray code: the cell that changes is the lowest set bit of i
+        cell = (i & -i).bit_length() - 1
+        board ^= flip_masks[cell]
+        pressed ^= 1 << cell
+        presses += 1 if pressed >> cell & 1 else -1
+        offset = board * ENTRY_SIZE
+        if presses < table[offset]:
+            table[offset] = presses
+            table[offset + 1] = (pressed & -pressed).bit_length() - 1
+    return table
+
+
+def write_solution_table(n: int):
+    """
+    Build the table of a grid size and write it to its file
+    :param n: grid size
+    :return: void
+    """
+    filename = SOLUTION_TABLE_TEMPLATE.format(n)
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    table = build_solution_table(n)
+    with open(filename, 'wb') as fp:
+        fp.write(table)
+    print('Wrote {} ({} bytes)'.format(filename, len(table)))
+
+
+@lru_cache(maxsize=None)
+def get_solution_table(n: int) -> Union[mmap.mmap, None]:
+    """
+    Memory-map the table of a grid size, only the pages of the looked up boards are read
+    :param n: grid size
+    :return: read-only table, None if it was not built
+    """
+    filename = SOLUTION_TABLE_TEMPLATE.format(n)
+    if n > SOLUTION_TABLE_MAX_SIZE or not os.path.isfile(filename) \
+            or os.path.getsize(filename) != ENTRY_SIZE << (n * n):
+        return None
+    with open(filename, 'rb') as fp:
+        return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def get_table_presses(board: int, n: int) -> Union[List[int], None]:
+    """
+    Follow the optimal moves of the table from a board to the goal
+    :param board: bitboard representation of the grid
+    :param n: grid size
+    :return: cell indexes (row * n + col) to press in order, or None if the board is not solvable
+    """
+    table = get_solution_table(n)
+    flip_masks = get_flip_masks(n)
+    if table[board * ENTRY_SIZE] == UNREACHABLE:
+        return None
+    presses = []
+    while board != 0:
+        move = table[board * ENTRY_SIZE + 1]
+        presses.append(move)
+        board ^= flip_masks[move]
+    return presses
+
+
+if __name__ == '__main__':
+    sizes = sys.argv[1:]
+    if len(sizes) == 0 or not all(size.isdigit() and 1 <= int(size) <= SOLUTION_TABLE_MAX_SIZE for size in sizes):
+        raise SystemExit('Usage: python3 solution_table.py N [N ...], with 1 <= N <= {}'.format(
+            SOLUTION_TABLE_MAX_SIZE))
+    for size in sizes:
+        write_solution_table(int(size))
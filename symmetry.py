@@ -0,0 +1,82 @@
+# -----------------------------------------------------------
+# symmetry.py 22/01/20
+#
+# Define the dihedral symmetries of the grid and the canonical form of a board
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+from functools import lru_cache
+from typing import Callable, List, Tuple
+
+CHUNK_BITS = 8
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+
+def get_symmetries(n: int) -> List[Callable[[int, int], Tuple[int, int]]]:
+    """
+    Get the 7 non-identity rotations and reflections of a square grid, mapping (row, col) to its image
+    :param n: grid size
+    :return: list of cell transformations
+    """
+    m = n - 1
+    return [
+        lambda r, c: (c, m - r),  # rotate 90
+        lambda r, c: (m - r, m - c),  # rotate 180
+        lambda r, c: (m - c, r),  # rotate 270
+        lambda r, c: (r, m - c),  # horizontal reflection
+        lambda r, c: (m - r, c),  # vertical reflection
+        lambda r, c: (c, r),  # transpose
+        lambda r, c: (m - c, m - r),  # anti-transpose
+    ]
+
+
+@lru_cache(maxsize=None)
+def get_symmetry_tables(n: int) -> List[List[List[int]]]:
+    """
+    Precompute, for each symmetry, the image of every value of every 8-bit chunk of a bitboard,
+    so a board is transformed with one lookup per chunk instead of one operation per cell
+    :param n: grid size
+    :return: for each symmetry, one 256 entries table per chunk, least significant chunk first
+    """
+    size = n * n
+    tables = []
+    for symmetry in get_symmetries(n):
+        # image_bits[p] is the bit position of the image of the cell stored at bit position p
+        image_bits = []
+        for position in range(size):
+            r, c = divmod(size - 1 - position, n)
+            image_r, image_c = symmetry(r, c)
+            image_bits.append(size - 1 - (image_r * n + image_c))
+        chunk_tables = []
+        for start in range(0, size, CHUNK_BITS):
+            table = []
+            for value in range(1 << CHUNK_BITS):
+                image = 0
+                for j in range(CHUNK_BITS):
+                    if value >> j & 1 and start + j < size:
+                        image |= 1 << image_bits[start + j]
+                table.append(image)
+            chunk_tables.append(table)
+        tables.append(chunk_tables)
+    return tables
+
+
+def get_canonical_board(board: int, n: int) -> int:
+    """
+    Get the smallest bitboard among the 8 rotations and reflections of a board.
+    Symmetric boards share their canonical board and are at the same distance from the goal
+    :param board: bitboard representation of the grid
+    :param n: grid size
+    :return: canonical bitboard
+    """
+    canonical = board
+    for chunk_tables in get_symmetry_tables(n):
+        image = 0
+        remaining = board
+        for table in chunk_tables:
+            image |= table[remaining & CHUNK_MASK]
+            remaining >>= CHUNK_BITS
+        if image < canonical:
+            canonical = image
+    return canonical
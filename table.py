@@ -0,0 +1,89 @@
+# -----------------------------------------------------------
+# table.py 22/01/20
+#
+# Define and run the lookup of the precomputed solution table
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import sys
+import time
+
+import constant
+from batch import get_jobs_argument, get_search_options, run_puzzles
+from linear_algebra import get_minimal_presses
+from puzzle_loader import read_puzzles
+from search_trace import SearchTrace
+from solution_table import get_solution_table, get_table_presses
+from utils import *
+
+
+def main(file_path):
+    """
+    Read file, retrieve puzzle info, and look up each puzzle in the solution table of its grid size
+    :param (string) file_path: relative path to the input file
+    :return: void
+    """
+    jobs = get_jobs_argument(sys.argv)
+    options = get_search_options(sys.argv)
+    prepare_performance_file(TABLE_ALGORITHM, NO_HEURISTIC)
+    puzzles = []
+    for puzzle_number, n, max_d, max_l, board, goal in read_puzzles(file_path):
+        puzzles.append({'board': board, 'n': n, 'puzzle_number': puzzle_number})
+    run_puzzles(execute_table, puzzles, TABLE_ALGORITHM, NO_HEURISTIC, jobs, options)
+
+
+def execute_table(board, n, puzzle_number, time_limit=TIME_TO_SOLVE_PUZZLE_SECONDS, trace_every=1,
+                  trace_format=TEXT_TRACE_FORMAT):
+    """
+    Wrapper for the table lookup
+    :param (int) board: bitboard representation of the input board
+    :param (int) n: grid size
+    :param (int) puzzle_number: line number of the puzzle for which the lookup is executed
+    :param (float) time_limit: unused, the lookup does not search
+    :param (int) trace_every: write one every trace_every visited states to the search file, 0 disables it
+    :param (string) trace_format: write the text search file, the binary one or both
+    :return (tuple): performance data of the run, see gather_performance
+    """
+    print('Execute table lookup on grid \n{} '.format(board_to_grid_string(board, n)))
+    search_path = SearchTrace(puzzle_number, TABLE_ALGORITHM, NO_HEURISTIC, n, trace_every, trace_format)
+    start_time = time.time()
+    try:
+        solution_path = table(board, n, search_path)
+    finally:
+        search_path.close()
+    end_time = time.time()
+    write_results(puzzle_number, TABLE_ALGORITHM, NO_HEURISTIC, solution_path)
+    print('Found no solution' if solution_path == constant.NO_SOLUTION
+          else 'Found result in {} moves'.format(len(solution_path) - 1))
+    return puzzle_number, n, solution_path, len(search_path), start_time, end_time, 0
+
+
+def table(board, n, search_path):
+    """
+    Solve the puzzle with the minimal number of presses by following the optimal move of each board in the table.
+    Grid sizes without a built table are solved with the linear solver
+    :param (int) board: bitboard representation of the input board
+    :param (int) n: grid size
+    :param (SearchTrace) search_path: states visited while applying the solution
+    :return (list | string): path up to identified solution. List of paths or 'no solution'
+    """
+    if get_solution_table(n) is not None:
+        presses = get_table_presses(board, n)
+    else:
+        print('No solution table for grid size {}, build it with: python3 solution_table.py {}'.format(n, n))
+        presses = get_minimal_presses(board, n)
+    if presses is None:
+        return constant.NO_SOLUTION
+
+    node = Node(board, 1)
+    search_path.append(node)
+    for index in presses:
+        node = Node(flip_token(node.board, n, *divmod(index, n)), node.depth + 1, node, index)
+        search_path.append(node)
+    return get_solution_path(node, n)
+
+
+if __name__ == '__main__':
+    # Define input file here
+    main('input.txt')
@@ -0,0 +1,101 @@
+# -----------------------------------------------------------
+# test_hda_star.py 22/01/20
+#
+# Check hash distributed a* against the optimal linear algebra solver
+#
+# Usage: python3 -m unittest test_hda_star
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+import contextlib
+import io
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from constant import DIV_BY_5_HEURISTIC, NO_SOLUTION
+import hda_star
+from hda_star import execute_hda_star
+from linear import execute_linear
+from output_writer import flush_output
+from utils import flip_token
+
+# Workers race on every run, so each search is repeated to catch an early termination
+REPEAT = 8
+
+
+class HdaStarTest(unittest.TestCase):
+    """
+    Multi-worker searches must find the solution length of the linear solver, which is optimal
+    """
+
+    def setUp(self):
+        """
+        Run in a temporary directory, the searches write their output files
+        """
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+
+    def tearDown(self):
+        """
+        Write the queued output before leaving the temporary directory
+        """
+        flush_output()
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def assert_optimal(self, board: int, n: int, workers: int):
+        """
+        Check that repeated multi-worker searches of a board find an optimal solution
+        :param board: bitboard representation of a solvable grid
+        :param n: grid size
+        :param workers: number of worker processes
+        """
+        with contextlib.redirect_stdout(io.StringIO()):
+            optimal = len(execute_linear(board, n, 0, trace_every=0)[2])
+        for _ in range(REPEAT):
+            with contextlib.redirect_stdout(io.StringIO()):
+                solution_path = execute_hda_star(board, n, 0, 10 ** 7, 0, DIV_BY_5_HEURISTIC, trace_every=0,
+                                                 workers=workers)[2]
+            self.assertNotEqual(solution_path, NO_SOLUTION)
+            self.assertEqual(len(solution_path), optimal)
+
+    def test_matches_linear(self):
+        for presses in [[(0, 0), (1, 2), (3, 3)], [(0, 1), (1, 3), (2, 0), (3, 2), (2, 2), (0, 3)]]:
+            board = 0
+            for r, c in presses:
+                board = flip_token(board, 4, r, c)
+            for workers in [2, 3]:
+                with self.subTest(board=board, workers=workers):
+                    self.assert_optimal(board, 4, workers)
+
+    def test_root_counted_before_workers_start(self):
+        # Workers used to stop before the root arrived, returning no solution after one searched node
+        self.assert_optimal(22255, 4, 2)
+
+    def test_more_than_256_cells(self):
+        # Press indexes of a 17x17 grid do not fit a byte
+        board = flip_token(flip_token(0, 17, 8, 8), 17, 16, 16)
+        self.assert_optimal(board, 17, 2)
+
+    def test_dead_worker(self):
+        # A worker exiting without its last message used to leave the parent waiting forever
+        search = hda_star.hda_star
+
+        def exit_second_worker(worker, *arguments):
+            if worker == 1:
+                os._exit(1)
+            search(worker, *arguments)
+
+        start_time = time.time()
+        with mock.patch('hda_star.hda_star', exit_second_worker), contextlib.redirect_stdout(io.StringIO()):
+            execute_hda_star(22255, 4, 0, 10 ** 7, 0, DIV_BY_5_HEURISTIC, time_limit=60, trace_every=0, workers=2)
+        self.assertLess(time.time() - start_time, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+# -----------------------------------------------------------
+# transposition.py 22/01/20
+#
+# Define the bounded transposition table used by the iterative deepening searches
+#
+# Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
+# All rights reserved.
+# -----------------------------------------------------------
+from collections import OrderedDict
+
+
+class TranspositionTable:
+    """
+    Bounded map from a bitboard to the smallest g(n) it was reached with during the current iteration.
+    Once full, the oldest entry is replaced
+    """
+    capacity: int
+    entries: 'OrderedDict[int, int]'
+
+    def __init__(self, capacity: int):
+        """
+        Generate TranspositionTable object
+        :param capacity: maximum number of entries, 0 disables the table
+        """
+        self.capacity = capacity
+        self.entries = OrderedDict()
+
+    def is_pruned(self, board: int, gn: int) -> bool:
+        """
+        Check if a board was already reached with a g(n) lower or equal, otherwise record it
+        :param board: bitboard representation of the grid
+        :param gn: g(n) the board is reached with
+        :return: True if the board can be skipped
+        """
+        if self.capacity == 0:
+            return False
+        best_gn = self.entries.get(board)
+        if best_gn is not None and best_gn <= gn:
+            return True
+        if best_gn is None and len(self.entries) >= self.capacity:
+            # The first key is the oldest entry, popped in constant time unlike the first key of a dict
+            self.entries.popitem(last=False)
+        self.entries[board] = gn
+        return False
+
+    def clear(self):
+        """
+        Forget every entry, done at the start of each iteration
+        :return: void
+        """
+        self.entries.clear()
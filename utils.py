@@ -6,268 +6,600 @@
 # Copyright (c) 2020-2021 Team Artificial Incompetence, COMP 472
 # All rights reserved.
 # -----------------------------------------------------------
-import copy
-import os
-from heapq import heappush
-from typing import Dict, Tuple, Union
-
-import numpy as np
+import sys
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple, Union
 
 from constant import *
-from heuristic import get_heuristic
+from bloom_filter import BloomFilter
+from heuristic import get_heuristic, get_children_heuristics
+from open_list import OpenList, BucketOpenList
+from output_writer import get_output_writer
+from search_metrics import SearchMetrics, FLIP_PHASE, HEURISTIC_PHASE, HEAP_PHASE
+from symmetry import get_canonical_board
+from transposition import TranspositionTable
+
+
+@lru_cache(maxsize=None)
+def get_flip_masks(n: int) -> List[int]:
+    """
+    Precompute the flip mask of every cell of a grid of size n, in row-major order.
+    The mask of a cell covers the cell itself and its 4 adjacent cells. Up, Down, Left, Right
+    :param n: grid size
+    :return: list of n * n bitboard masks, indexed by row * n + col
+    """
+    dirs = [[0, 0], [1, 0], [-1, 0], [0, 1], [0, -1]]
+    masks = []
+    for r in range(n):
+        for c in range(n):
+            mask = 0
+            for i in range(5):
+                nxt_row = r + dirs[i][0]
+                nxt_col = c + dirs[i][1]
+                if 0 <= nxt_row < n and 0 <= nxt_col < n:
+                    mask |= get_cell_bit(n, nxt_row, nxt_col)
+            masks.append(mask)
+    return masks
+
+
+@lru_cache(maxsize=None)
+def get_frozen_masks(n: int) -> List[int]:
+    """
+    Precompute the cells that can no longer be flipped once a cell is pressed, when presses are made
+    in increasing cell order. A press flips cells at most n indexes before it,
+    so after pressing index k the cells up to index k - n are final
+    :param n: grid size
+    :return: list of n * n bitboard masks, indexed by the last pressed cell
+    """
+    size = n * n
+    masks = []
+    for index in range(size):
+        frozen = max(0, index - n + 1)
+        masks.append(((1 << frozen) - 1) << (size - frozen))
+    return masks
+
+
+def get_child_moves(node: Node, n: int, ordered: bool) -> Iterable[Tuple[int, int]]:
+    """
+    Get the cells that can be pressed from a node with their flip mask.
+    Presses commute and a double press cancels, so in ordered mode a solution is only searched
+    in increasing cell order: only cells after the last pressed one are pressed,
+    and a press leaving a black token on a frozen cell is skipped
+    :param node: Node object
+    :param n: grid size
+    :param ordered: if True, only generate the presses of the increasing order
+    :return: cell index and flip mask of each child
+    """
+    flip_masks = get_flip_masks(n)
+    if not ordered:
+        return enumerate(flip_masks)
+    frozen_masks = get_frozen_masks(n)
+    return ((index, flip_masks[index]) for index in range(node.move + 1, n * n)
+            if (node.board ^ flip_masks[index]) & frozen_masks[index] == 0)
+
+
+@lru_cache(maxsize=None)
+def get_press_bits(n: int) -> List[int]:
+    """
+    Precompute the bit of every cell of a grid of size n, in row-major order
+    :param n: grid size
+    :return: list of n * n bitboards with a single cell set, indexed by row * n + col
+    """
+    return [get_cell_bit(n, *divmod(index, n)) for index in range(n * n)]
+
+
+def expand_children(node: Node, n: int, heuristic_algorithm: str, ordered: bool = False,
+                    metrics: Union[SearchMetrics, None] = None) \
+        -> Tuple[List[int], List[int], List[int], List[int], List[float]]:
+    """
+    Build all the children of a node in one pass, before they are filtered against the open and closed sets:
+    their boards, black tokens, pressed cells and h(n), the heuristic being dispatched once per node.
+    The tie-break score of a child is its board, see get_white_token_score
+    :param node: Node object
+    :param n: grid size
+    :param heuristic_algorithm: Which heuristic to use
+    :param ordered: if True, only generate the presses of the increasing order, see get_child_moves
+    :param metrics: metrics of a sampled expansion, timing the flips and the heuristic, else None
+    :return: pressed cell index, board, black tokens, press bit and h(n) of each child
+    """
+    press_bits = get_press_bits(n)
+    if ordered:
+        moves = list(get_child_moves(node, n, ordered))
+        indexes = [index for index, _ in moves]
+        boards = [node.board ^ mask for _, mask in moves]
+        new_presses = [press_bits[index] for index in indexes]
+    else:
+        indexes = range(n * n)
+        boards = [node.board ^ mask for mask in get_flip_masks(n)]
+        new_presses = press_bits
+    black_tokens = list(map(count_black_tokens, boards))
+    if metrics is not None:
+        metrics.lap(FLIP_PHASE)
+    hns = get_children_heuristics(heuristic_algorithm, black_tokens, node.pressed_cells, new_presses)
+    if metrics is not None:
+        metrics.lap(HEURISTIC_PHASE)
+    return indexes, boards, black_tokens, new_presses, hns
+
+
+def get_cell_bit(n: int, r: int, c: int) -> int:
+    """
+    Get the bit of a single cell. The first cell of the grid is the most significant bit
+    Example: n = 2, r = 0, c = 0 => 0b1000
+    :param n: grid size
+    :param r: row index
+    :param c: column index
+    :return: bitboard with only the cell set
+    """
+    return 1 << (n * n - 1 - (r * n + c))
 
 
-def flip_token(grid: np.ndarray, r: int, c: int) -> int:
+def flip_token(board: int, n: int, r: int, c: int) -> int:
     """
     Flip current token and 4 adjacent cells. Up, Down, Left, Right
-    :param grid: numpy 2-D array
+    :param board: bitboard representation of the grid
+    :param n: grid size
     :param r: row index
     :param c: column index
-    :return: difference in number of black pegs after flip
+    :return: bitboard after the flip
     """
-    dirs = [[1, 0], [-1, 0], [0, 1], [0, -1]]
-    n = len(grid)
-    count_flipped = 0
-    grid[r][c] = 1 - grid[r][c]
-    count_flipped += -1 if grid[r][c] == 0 else 1
-    for i in range(4):
-        nxt_row = r + dirs[i][0]
-        nxt_col = c + dirs[i][1]
-        if 0 <= nxt_row < n and 0 <= nxt_col < n:
-            grid[nxt_row][nxt_col] = 1 - grid[nxt_row][nxt_col]
-            count_flipped += -1 if grid[nxt_row][nxt_col] == 0 else 1
-    return count_flipped
+    return board ^ get_flip_masks(n)[r * n + c]
 
 
-def grid_to_string(grid: np.ndarray) -> str:
+def count_black_tokens(board: int) -> int:
     """
-    Get string version of the 2D numpy array
-    Example: [[1,1],[0,0]] => '1 1 0 0'
-    :param grid: numpy 2-D array
-    :return: string representation of string
+    Count the number of black tokens of a bitboard (popcount)
+    :param board: bitboard representation of the grid
+    :return: number of black tokens
     """
-    return ' '.join(map(str, [value for row in grid for value in row]))
+    return bin(board).count('1')
 
 
-def string_to_grid(s_grid: str, n: int) -> np.ndarray:
+def board_to_string(board: int, n: int, separator: str = ' ') -> str:
     """
-    Construct 2-D numpy array from its string representation
-    :param s_grid: grid data
+    Get string version of the bitboard
+    Example: (board = 0b1100, n = 2) => '1 1 0 0'
+    :param board: bitboard representation of the grid
     :param n: grid size
-    :return: 2-D numpy grid
+    :param separator: string inserted between cells
+    :return: string representation of the grid
     """
-    grid = np.empty([n, n], dtype=int)
-    row_num = int(len(s_grid) / n)
-    for i in range(row_num):
-        start = n * i
-        end = start + n
-        row = np.array([int(val) for val in list(s_grid[start:end])])
-        grid[i] = row
-    return grid
+    return separator.join(format(board, '0{}b'.format(n * n)))
 
 
-def get_puzzle_info(puzzle: str) -> Tuple[int, int, np.ndarray, str]:
+def board_to_grid_string(board: int, n: int) -> str:
+    """
+    Get the multi-line version of the bitboard, one row per line
+    Example: (board = 0b1100, n = 2) => '1 1\n0 0'
+    :param board: bitboard representation of the grid
+    :param n: grid size
+    :return: printable representation of the grid
+    """
+    config = board_to_string(board, n, '')
+    return '\n'.join(' '.join(config[i:i + n]) for i in range(0, n * n, n))
+
+
+def string_to_board(s_grid: str) -> int:
+    """
+    Construct the bitboard from its string representation
+    Example: '1100' => 0b1100
+    :param s_grid: grid data
+    :return: bitboard representation of the grid
     """
-    Return max_d, max_l, ndarray grid and goal string from the puzzle string
+    return int(s_grid.replace(' ', ''), 2)
+
+
+def get_puzzle_info(puzzle: str, line_number: int = 1) -> Tuple[int, int, int, int, int]:
+    """
+    Return n, max_d, max_l, bitboard and goal bitboard from the puzzle string
+    Example: '2 1 10 1100' => (2, 1, 10, 0b1100, 0)
     :param puzzle: file line that describes puzzle
-    :return: max_d, max_l, grid, goal
-    """
-    puzzle = puzzle.split(' ')
-    n = int(puzzle[0])
-    max_d = int(puzzle[1])
-    max_l = int(puzzle[2])
-    board = puzzle[3]
-    grid = string_to_grid(board, n)
+    :param line_number: line of the puzzle in its file, reported by the errors
+    :return: n, max_d, max_l, board, goal
+    """
+    fields = puzzle.split()
+    if len(fields) != 4:
+        raise PuzzleFormatError('Line {}: expected n, max_d, max_l and board, got {} fields'.format(
+            line_number, len(fields)))
+    for name, value in zip(['n', 'max_d', 'max_l'], fields):
+        if not value.isdigit() or int(value) < 1:
+            raise PuzzleFormatError('Line {}: {} must be a positive integer, got {!r}'.format(line_number, name, value))
+    n = int(fields[0])
+    max_d = int(fields[1])
+    max_l = int(fields[2])
+    if len(fields[3]) != n * n or fields[3].strip('01'):
+        raise PuzzleFormatError('Line {}: board must be {} cells of 0 or 1, got {!r}'.format(
+            line_number, n * n, fields[3]))
+    board = string_to_board(fields[3])
     goal = get_goal_state(n)
-    return max_d, max_l, grid, goal
+    return n, max_d, max_l, board, goal
 
 
-def get_goal_state(n: int) -> str:
+def get_goal_state(n: int) -> int:
     """
-    Get serialized version of the goal grid
-    Example: (n = 3) => '000000000'
+    Get bitboard version of the goal grid
+    Example: (n = 3) => 0
     :param n: shape of the 2-D grid, filled with zeros
-    :return: serialized version of the goal grid
+    :return: bitboard version of the goal grid
     """
-    goal_grid = np.zeros([n, n], dtype=int)
-    return grid_to_string(goal_grid)
+    return 0
 
 
-def get_solution_move(row: int, col: int, s_grid: str) -> str:
+def get_solution_move(row: int, col: int, board: int, n: int) -> str:
     """
     Generate move string to be added to the current node's path
-    Example: row = 0, col = 0, config = '1 1 0 0' => 'A1  1 1 0 0'
+    Example: row = 0, col = 0, board = 0b1100, n = 2 => 'A1  1 1 0 0'
     :param row: row index
     :param col: column index
-    :param s_grid: serialized version of the grid
+    :param board: bitboard representation of the grid
+    :param n: grid size
     :return: solution move
     """
     ascii_of_a = 65
     token = chr(ascii_of_a + row) + str(col + 1)
-    return '{}  {}'.format(token, s_grid)
+    return '{}  {}'.format(token, board_to_string(board, n))
 
 
-def get_search_move(search_algorithm: str, node: Node) -> str:
+def get_search_values(search_algorithm: str, node: Node) -> Tuple[Union[int, float], int, Union[int, float]]:
     """
-    Prepend configuration with required heuristic data
+    Get the f(n), g(n) and h(n) written for a searched node, given the search algorithm
     :param search_algorithm: type of search algorithm
     :param node: Node object
+    :return: fn, gn, hn
+    """
+    hn = node.get_hn() if search_algorithm in [BEST_FIRST_ALGORITHM, A_STAR_ALGORITHM, IDA_STAR_ALGORITHM,
+                                               BIDIRECTIONAL_ALGORITHM, ANYTIME_ALGORITHM, HDA_STAR_ALGORITHM,
+                                               BEAM_ALGORITHM] else 0
+    gn = node.get_gn() if search_algorithm in [A_STAR_ALGORITHM, IDA_STAR_ALGORITHM, ANYTIME_ALGORITHM,
+                                               HDA_STAR_ALGORITHM] else 0
+    return hn + gn, gn, hn
+
+
+def format_search_move(fn: Union[int, float], gn: int, hn: Union[int, float], config: str) -> str:
+    """
+    Format a search move
+    Example: fn = 3, gn = 1, hn = 2, config = '1100' => '3 1 2 1100'
+    :param fn: f(n) of the node
+    :param gn: g(n) of the node
+    :param hn: h(n) of the node
+    :param config: grid string without separators
     :return: search move
     """
-    hn = node.get_hn() if search_algorithm in [BEST_FIRST_ALGORITHM, A_STAR_ALGORITHM] else 0
-    gn = node.get_gn() if search_algorithm == A_STAR_ALGORITHM else 0
-    fn = hn + gn
-    config = node.s_grid.replace(' ', '')
     return '{} {} {} {}'.format(fn, gn, hn, config)
 
 
+def get_search_move(search_algorithm: str, node: Node, n: int) -> str:
+    """
+    Prepend configuration with required heuristic data
+    :param search_algorithm: type of search algorithm
+    :param node: Node object
+    :param n: grid size
+    :return: search move
+    """
+    fn, gn, hn = get_search_values(search_algorithm, node)
+    return format_search_move(fn, gn, hn, board_to_string(node.board, n, ''))
+
+
+def get_solution_path(node: Node, n: int) -> List[str]:
+    """
+    Reconstruct the solution path by walking back from a node to the root node
+    Example: ['0   1 1 0 0', 'A1  0 0 1 0']
+    :param node: Node object
+    :param n: grid size
+    :return: path from the root to the node
+    """
+    path = []
+    while node.parent is not None:
+        row, col = divmod(node.move, n)
+        path.append(get_solution_move(row, col, node.board, n))
+        node = node.parent
+    path.append('{}   {}'.format(0, board_to_string(node.board, n)))
+    path.reverse()
+    return path
+
+
+def get_state_key(board: int, move: int, n: int, symmetry: bool, ordered: bool = False) -> Union[int, Tuple[int, int]]:
+    """
+    Get the key of a board in the open and closed sets
+    :param board: bitboard representation of the grid
+    :param move: index of the cell pressed to reach the board
+    :param n: grid size
+    :param symmetry: if True, symmetric boards share the key of their canonical board
+    :param ordered: if True, the presses left depend on the last one, which is part of the key
+    :return: key of the board
+    """
+    if ordered:
+        return board, move
+    return get_canonical_board(board, n) if symmetry else board
+
+
 def evaluate_dfs_children(open_list: List[Node],
-                          open_set: Set[str],
-                          closed_dict: Dict[str, int],
-                          node: Node):
+                          open_set: Set[int],
+                          closed_dict: Dict[int, int],
+                          node: Node,
+                          n: int,
+                          symmetry: bool = False,
+                          ordered: bool = False,
+                          metrics: Union[SearchMetrics, None] = None) -> Tuple[int, int]:
     """
     Evaluate each child and properly insert them in the open list.
     :param open_list: stack containing all discovered nodes
-    :param open_set: Set containing all grid strings of all discovered nodes from open_list
-    :param closed_dict: Dictionary containing all visited grid strings
+    :param open_set: Set containing all bitboards of all discovered nodes from open_list
+    :param closed_dict: Dictionary containing all visited bitboards
     :param node: Node object
-    :return: void
+    :param n: grid size
+    :param symmetry: if True, the sets are keyed by canonical board, see get_state_key
+    :param ordered: if True, presses are made in increasing cell order, see get_child_moves
+    :param metrics: metrics of a sampled expansion, else None
+    :return: number of children generated and added to the open list
     """
-    children_s_grids = []
+    children_boards = []
     children_nodes = {}
-    for row, col in np.ndindex(node.grid.shape):
-        child_grid = np.copy(node.grid)
-        flip_token(child_grid, row, col)
-        child_s_grid = grid_to_string(child_grid)
-        if child_s_grid not in open_set \
-                and (child_s_grid not in closed_dict or closed_dict[child_s_grid] > node.depth + 1):
-            open_set.add(child_s_grid)
-            child_solution_move = get_solution_move(row, col, child_s_grid)
-            child_path_from_root = copy.deepcopy(node.path_from_root)
-            child_path_from_root.append(child_solution_move)
-            children_nodes[child_s_grid] = Node(child_grid, child_s_grid, node.depth + 1, child_path_from_root)
-            children_s_grids.append(child_s_grid)
-
-    children_s_grids.sort(key=lambda s_grid: get_white_token_score(s_grid), reverse=True)
-    open_list.extend([children_nodes[child_config] for child_config in children_s_grids])
-
-
-def evaluate_a_star_children(open_list: List[Tuple[float, int, Node]],
-                             open_set: Set[str],
-                             closed_set: set,
+    children = [(index, node.board ^ mask) for index, mask in get_child_moves(node, n, ordered)]
+    if metrics is not None:
+        metrics.lap(FLIP_PHASE)
+    for index, child_board in children:
+        child_key = get_state_key(child_board, index, n, symmetry, ordered)
+        if child_key not in open_set \
+                and (child_key not in closed_dict or closed_dict[child_key] > node.depth + 1):
+            open_set.add(child_key)
+            children_nodes[child_board] = Node(child_board, node.depth + 1, node, index)
+            children_boards.append(child_board)
+
+    children_boards.sort(key=get_white_token_score, reverse=True)
+    open_list.extend([children_nodes[child_board] for child_board in children_boards])
+    if metrics is not None:
+        metrics.lap(HEAP_PHASE)
+    return len(children), len(children_boards)
+
+
+def evaluate_a_star_children(open_list: Union[OpenList, BucketOpenList],
+                             closed_dict: Dict[int, int],
                              node: Node,
-                             heuristic_algorithm: str):
+                             heuristic_algorithm: str,
+                             n: int,
+                             symmetry: bool = False,
+                             ordered: bool = False,
+                             reopen: bool = False,
+                             metrics: Union[SearchMetrics, None] = None,
+                             weight: float = 1) -> Tuple[int, int]:
     """
-    Evaluate all of a node's children and add them to the open list
-    :param open_list: Priority Queue containing all discovered nodes
-    :param open_set: Set containing all grid strings of all discovered nodes from open_list
-    :param closed_set: Set containing all visited grid strings
+    Evaluate all of a node's children and add them to the open list.
+    A child whose board is open with a higher g(n) replaces it
+    :param open_list: Priority Queue containing all discovered nodes, by f(n)
+    :param closed_dict: visited bitboards and the g(n) they were searched with
     :param node: Node object
     :param heuristic_algorithm: Which heuristic to use
-    :return: void
+    :param n: grid size
+    :param symmetry: if True, the sets are keyed by canonical board, see get_state_key
+    :param ordered: if True, presses are made in increasing cell order, see get_child_moves
+    :param reopen: if True, a visited board reached with a lower g(n) is added again
+    :param metrics: metrics of a sampled expansion, else None
+    :param weight: factor of h(n) in the priority g(n) + weight * h(n), 1 for A*
+    :return: number of children generated and added to the open list
     """
-    for row, col in np.ndindex(node.grid.shape):
-        child_grid = np.copy(node.grid)
-        diff_black_tokens = flip_token(child_grid, row, col)
-        child_s_grid: str = grid_to_string(child_grid)
-        child_move = '{}:{}'.format(row, col)
-        child_hn: float = get_heuristic(heuristic_algorithm, node.black_tokens, diff_black_tokens,
-                                        node.move_history, child_move)
-        if child_hn != DOUBLE_PRESS and child_s_grid not in open_set and child_s_grid not in closed_set:
-            child_path = copy.deepcopy(node.path_from_root)
-            child_path.append(get_solution_move(row, col, child_s_grid))
-            child_moves = copy.deepcopy(node.move_history)
-            child_moves.add(child_move)
-            child_depth = node.depth + 1
-
-            child_node = Node(child_grid, child_s_grid, child_depth, child_path, child_hn,
-                              node.black_tokens + diff_black_tokens, child_moves)
-            # Add child to open set and priority queue
-            heappush(open_list, (child_node.get_fn(), get_white_token_score(child_s_grid), child_node))
-            open_set.add(child_s_grid)
-
-
-def evaluate_bfs_children(open_list: List[Tuple[float, int, Node]],
-                          open_set: Set[str],
-                          closed_set: set,
+    child_depth = node.depth + 1
+    generated = 0
+    added = 0
+    for index, child_board, child_black_tokens, child_press, child_hn in \
+            zip(*expand_children(node, n, heuristic_algorithm, ordered, metrics)):
+        if child_hn == DOUBLE_PRESS:
+            continue
+        generated += 1
+        child_key = get_state_key(child_board, index, n, symmetry, ordered)
+        if child_key in closed_dict and not (reopen and closed_dict[child_key] > child_depth):
+            continue
+        if not open_list.is_open_with(child_key, child_depth):
+            child_node = Node(child_board, child_depth, node, index, child_hn,
+                              child_black_tokens, node.pressed_cells | child_press)
+            # Add child to the priority queue, or lower the g(n) of its board
+            added += open_list.push(child_key, child_node, child_depth + weight * child_hn,
+                                    get_white_token_score(child_board))
+    if metrics is not None:
+        metrics.lap(HEAP_PHASE)
+    return generated, added
+
+
+def evaluate_bfs_children(open_list: Union[OpenList, BucketOpenList],
+                          closed_set: Set[int],
                           node: Node,
-                          heuristic_algorithm: str):
+                          heuristic_algorithm: str,
+                          n: int,
+                          symmetry: bool = False,
+                          ordered: bool = False,
+                          metrics: Union[SearchMetrics, None] = None) -> Tuple[int, int]:
     """
     Evaluate all of a node's children and add them to the open list
-    :param open_list: Priority Queue containing all discovered nodes
-    :param open_set: Set containing all grid strings of all discovered nodes from open_list
-    :param closed_set: Set containing all visited grid strings
+    :param open_list: Priority Queue containing all discovered nodes, by h(n)
+    :param closed_set: Set containing all visited bitboards
     :param node: Node object
     :param heuristic_algorithm: Which heuristic to use
+    :param n: grid size
+    :param symmetry: if True, the sets are keyed by canonical board, see get_state_key
+    :param ordered: if True, presses are made in increasing cell order, see get_child_moves
+    :param metrics: metrics of a sampled expansion, else None
+    :return: number of children generated and added to the open list
+    """
+    generated = 0
+    added = 0
+    for index, child_board, child_black_tokens, child_press, child_hn in \
+            zip(*expand_children(node, n, heuristic_algorithm, ordered, metrics)):
+        if child_hn == DOUBLE_PRESS:
+            continue
+        generated += 1
+        child_key = get_state_key(child_board, index, n, symmetry, ordered)
+        if child_key not in open_list and child_key not in closed_set:
+            child_node = Node(child_board, node.depth, node, index, child_hn,
+                              child_black_tokens, node.pressed_cells | child_press)
+            # Add child to priority queue
+            added += open_list.push(child_key, child_node, child_node.get_hn(), get_white_token_score(child_board))
+    if metrics is not None:
+        metrics.lap(HEAP_PHASE)
+    return generated, added
+
+
+def evaluate_iddfs_children(open_list: List[Node],
+                            transposition_table: TranspositionTable,
+                            node: Node,
+                            n: int):
+    """
+    Evaluate each child and push them on the depth-limited stack.
+    Undoing the parent's move and boards already reached at a lower or equal depth are skipped
+    :param open_list: stack containing the discovered nodes of the current iteration
+    :param transposition_table: boards reached during the current iteration
+    :param node: Node object
+    :param n: grid size
     :return: void
     """
-    for row, col in np.ndindex(node.grid.shape):
-        child_grid = np.copy(node.grid)
-        diff_black_tokens = flip_token(child_grid, row, col)
-        child_s_grid: str = grid_to_string(child_grid)
-        child_move = '{}:{}'.format(row, col)
-        child_hn: float = get_heuristic(heuristic_algorithm, node.black_tokens, diff_black_tokens,
-                                        node.move_history, child_move)
-        if child_hn != DOUBLE_PRESS and child_s_grid not in open_set and child_s_grid not in closed_set:
-            child_path = copy.deepcopy(node.path_from_root)
-            child_path.append(get_solution_move(row, col, child_s_grid))
-            child_moves = copy.deepcopy(node.move_history)
-            child_moves.add(child_move)
-
-            child_node = Node(child_grid, child_s_grid, node.depth, child_path, child_hn,
-                              node.black_tokens + diff_black_tokens, child_moves)
-            # Add child to open set and priority queue
-            heappush(open_list, (child_node.get_hn(), get_white_token_score(child_s_grid), child_node))
-            open_set.add(child_s_grid)
-
-
-def get_white_token_score(s_grid: str) -> int:
-    """
-    Returns the numerical value of a grid string, considering
-    it as the string representation of a binary number
-    :param s_grid: The string representation of a grid
-    :return: numerical value of string grid
+    children = []
+    for index, mask in enumerate(get_flip_masks(n)):
+        child_board = node.board ^ mask
+        if index != node.move and not transposition_table.is_pruned(child_board, node.depth + 1):
+            children.append(Node(child_board, node.depth + 1, node, index))
+
+    children.sort(key=lambda child: get_white_token_score(child.board), reverse=True)
+    open_list.extend(children)
+
+
+def evaluate_ida_star_children(open_list: List[Node],
+                               transposition_table: TranspositionTable,
+                               node: Node,
+                               heuristic_algorithm: str,
+                               n: int,
+                               threshold: float) -> float:
     """
-    return int(s_grid.replace(' ', ''), 2)
+    Evaluate each child and push the ones within the f(n) threshold on the stack
+    :param open_list: stack containing the discovered nodes of the current iteration
+    :param transposition_table: boards reached during the current iteration
+    :param node: Node object
+    :param heuristic_algorithm: Which heuristic to use
+    :param n: grid size
+    :param threshold: maximum f(n) of the current iteration
+    :return: smallest f(n) above the threshold, infinity if none
+    """
+    next_threshold = float('inf')
+    children = []
+    for index, child_board, child_black_tokens, child_press, child_hn in \
+            zip(*expand_children(node, n, heuristic_algorithm)):
+        if index == node.move or child_hn == DOUBLE_PRESS:
+            continue
+        child_fn = child_hn + node.depth + 1
+        if child_fn > threshold:
+            next_threshold = min(next_threshold, child_fn)
+        elif not transposition_table.is_pruned(child_board, node.depth + 1):
+            children.append(Node(child_board, node.depth + 1, node, index, child_hn,
+                                 child_black_tokens, node.pressed_cells | child_press))
+
+    # Best child last, it is popped first
+    children.sort(key=lambda child: (child.get_fn(), get_white_token_score(child.board)), reverse=True)
+    open_list.extend(children)
+    return next_threshold
+
+
+def evaluate_bidirectional_children(next_layer: List[Node],
+                                    seen: Dict[int, Node],
+                                    other_seen: Dict[int, Node],
+                                    node: Node,
+                                    n: int) -> Union[Tuple[Node, Node], None]:
+    """
+    Evaluate each child of a frontier node and add the new ones to the next layer
+    :param next_layer: nodes of the next layer of this frontier
+    :param seen: all nodes discovered by this frontier, by bitboard
+    :param other_seen: all nodes discovered by the opposite frontier, by bitboard
+    :param node: Node object
+    :param n: grid size
+    :return: the shallowest meeting of both frontiers, as a pair of nodes with the same board, or None
+    """
+    meeting = None
+    for index, mask in enumerate(get_flip_masks(n)):
+        child_board = node.board ^ mask
+        if child_board in seen:
+            continue
+        child_node = Node(child_board, node.depth + 1, node, index)
+        seen[child_board] = child_node
+        next_layer.append(child_node)
+        other_node = other_seen.get(child_board)
+        if other_node is not None and (meeting is None or other_node.depth < meeting[1].depth):
+            meeting = (child_node, other_node)
+    return meeting
+
+
+def join_bidirectional_path(node: Node, other_node: Node) -> Node:
+    """
+    Extend a path with the reversed path of the opposite frontier. Every move is its own inverse,
+    so pressing the opposite node's move leads to its parent
+    :param node: end of the path from the root
+    :param other_node: node of the opposite frontier with the same board
+    :return: end of the joined path
+    """
+    while other_node.parent is not None:
+        node = Node(other_node.parent.board, node.depth + 1, node, other_node.move)
+        other_node = other_node.parent
+    return node
 
 
-def write_results(puzzle_number: int, algorithm: str, heuristic: str, solution_path, search_path: List[str]):
+def get_front_to_front_heuristic(heuristic_algorithm: str, board: int, other_layer: List[Node]) -> float:
     """
-    Dump solution_path and search_path to files
+    Estimate the distance from a board to the closest node of a sample of the opposite frontier,
+    applying the heuristic to the difference of both boards
+    :param heuristic_algorithm: Which heuristic to use
+    :param board: bitboard representation of the grid
+    :param other_layer: current layer of the opposite frontier
+    :return: h(n)
+    """
+    sample = other_layer[:FRONT_TO_FRONT_SAMPLE_SIZE]
+    return min(get_heuristic(heuristic_algorithm, count_black_tokens(board ^ other.board), 0, 0, 0)
+               for other in sample)
+
+
+def get_white_token_score(board: int) -> int:
+    """
+    Returns the numerical value of a grid, considering
+    it as the string representation of a binary number.
+    The bitboard already stores the first cell as the most significant bit
+    :param board: The bitboard representation of a grid
+    :return: numerical value of the grid
+    """
+    return board
+
+
+def write_results(puzzle_number: int, algorithm: str, heuristic: str, solution_path):
+    """
+    Hand solution_path to the output writer. The search path is streamed to its file by SearchTrace
     :param solution_path: path up to identified solution. List of paths or 'no solution'
-    :param search_path: close list of searched nodes
     :param puzzle_number: line number of the puzzle prepended to the name of the file
     :param algorithm: Algorithm used for the current run
     :param heuristic: Heuristic used to solve puzzle
     :return: void
     """
     filename = SOLUTION_FILE_TEMPLATE.format(heuristic, puzzle_number, algorithm)
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    with open(filename, 'w') as fp:
-        if type(solution_path) is str:
-            fp.write(solution_path)
-        else:
-            for path in solution_path:
-                fp.write('{}\n'.format(path))
-    filename = SEARCH_FILE_TEMPLATE.format(heuristic, puzzle_number, algorithm)
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    with open(filename, 'w') as fp:
-        for path in search_path:
-            fp.write('{}\n'.format(path))
+    if type(solution_path) is str:
+        get_output_writer().write(filename, solution_path)
+    else:
+        get_output_writer().write(filename, ''.join('{}\n'.format(path) for path in solution_path))
+
+
+def get_closed_set_memory(closed_set: Union[Set, Dict, BloomFilter]) -> int:
+    """
+    Estimate the bytes held by a closed set: the bit array of a filter,
+    or the container and the keys of a set or dictionary
+    :param closed_set: visited boards of a search
+    :return: memory size in bytes
+    """
+    if isinstance(closed_set, BloomFilter):
+        return closed_set.get_memory_size()
+    return sys.getsizeof(closed_set) + sum(map(sys.getsizeof, closed_set))
 
 
 def gather_performance(puzzle_number: int, grid_size: int, solution_path: Union[str, list], search_path_len: int,
-                       start_time: float, end_time: float, algorithm: str, heuristic: str):
+                       start_time: float, end_time: float, closed_set_memory: int, algorithm: str, heuristic: str):
     filename = PERFORMANCE_DIR_TEMPLATE.format(algorithm, heuristic)
-    with open(filename, 'a') as fp:
-        fp.write(PERFORMANCE_FILE_LINE.format(puzzle_number, grid_size,
-                                              NO_SOLUTION if solution_path == NO_SOLUTION else len(solution_path),
-                                              search_path_len, end_time - start_time))
+    get_output_writer().write(filename, PERFORMANCE_FILE_LINE.format(
+        puzzle_number, grid_size, NO_SOLUTION if solution_path == NO_SOLUTION else len(solution_path),
+        search_path_len, end_time - start_time, closed_set_memory), append=True)
 
 
 def prepare_performance_file(algorithm: str, heuristic: str):
     filename = PERFORMANCE_DIR_TEMPLATE.format(algorithm, heuristic)
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    with open(filename, 'w') as fp:
-        fp.write(PERFORMANCE_FILE_HEADER.format('Puzzle number', 'Grid size',
-                                                'Solution length', 'Search length', 'Time taken (seconds)'))
+    get_output_writer().write(filename, PERFORMANCE_FILE_HEADER.format(
+        'Puzzle number', 'Grid size', 'Solution length', 'Search length', 'Time taken (seconds)',
+        'Closed set memory (bytes)'))